@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
+from caching import LruCache
+from quantiles import QUANTILES, group_quantiles
+
 AGGREGATIONS = {
     "None (raw rows)": None,
     "Count": "count",
@@ -9,33 +16,259 @@ AGGREGATIONS = {
     "Mean": "mean",
     "Min": "min",
     "Max": "max",
+    "Median": "median",
+    "P95": "p95",
+    "P99": "p99",
 }
 
+TIME_BUCKETS = {
+    "Off": "none",
+    "Auto": "auto",
+    "1 second": "1s",
+    "1 minute": "1min",
+    "1 hour": "1h",
+    "1 day": "1D",
+}
+# Candidate widths for "auto", finest first; the first one giving at most
+# AUTO_BUCKET_TARGET buckets over the data's time span wins.
+AUTO_BUCKET_FREQUENCIES = (
+    "1ms", "10ms", "100ms", "1s", "10s", "1min", "5min", "15min",
+    "1h", "6h", "1D", "7D",
+)
+AUTO_BUCKET_TARGET = 1000
 
-def build_chart_data(filtered_data: pd.DataFrame, config: dict) -> pd.DataFrame:
-    aggregation = config["aggregation"]
-    if aggregation == "None (raw rows)":
-        return filtered_data.copy()
 
-    agg_func = AGGREGATIONS[aggregation]
-    groupers = [config["x_axis"]]
+def bucket_frequency(timestamps: pd.Series, time_bucket: str) -> str | None:
+    """Resolve ``time_bucket`` to a pandas frequency for ``timestamps``."""
+    if time_bucket == "none" or not pd.api.types.is_datetime64_any_dtype(timestamps):
+        return None
+    if time_bucket != "auto":
+        return time_bucket
+    start, end = timestamps.min(), timestamps.max()
+    if pd.isna(start):
+        return None
+    span = end - start
+    for frequency in AUTO_BUCKET_FREQUENCIES:
+        if span / pd.Timedelta(frequency) <= AUTO_BUCKET_TARGET:
+            return frequency
+    return AUTO_BUCKET_FREQUENCIES[-1]
+
 
+def _group_columns(config: dict) -> list[str]:
+    """Columns grouped on next to the x-axis: color and the chart type's extras."""
+    columns = []
     if config["color_dimension"] != "(none)":
-        groupers.append(config["color_dimension"])
+        columns.append(config["color_dimension"])
 
     if config["chart_type"] == "Line":
         if config["line_symbol"] != "(none)":
-            groupers.append(config["line_symbol"])
+            columns.append(config["line_symbol"])
         if config["line_dash"] != "(none)":
-            groupers.append(config["line_dash"])
+            columns.append(config["line_dash"])
 
     if config["chart_type"] == "Bar":
         if config["bar_pattern"] != "(none)":
-            groupers.append(config["bar_pattern"])
+            columns.append(config["bar_pattern"])
         if config["bar_facet"] != "(none)":
-            groupers.append(config["bar_facet"])
+            columns.append(config["bar_facet"])
+    return columns
+
+
+def chart_columns(config: dict) -> list[str]:
+    """Columns of the filtered rows that the chart data for ``config`` reads."""
+    return list(dict.fromkeys([config["x_axis"], config["y_axis"], *_group_columns(config)]))
+
 
-    return (
-        filtered_data.groupby(groupers, dropna=False, as_index=False)[config["y_axis"]]
-        .agg(agg_func)
+def _grouping(filtered_data: pd.DataFrame, config: dict) -> tuple[list, tuple]:
+    """Group keys for ``config`` and a hashable description of them."""
+    frequency = bucket_frequency(filtered_data[config["x_axis"]], config["time_bucket"])
+    x_key = config["x_axis"]
+    if frequency is not None:
+        # Group on the bucket start instead of the raw timestamp.
+        x_key = filtered_data[config["x_axis"]].dt.floor(frequency)
+    columns = _group_columns(config)
+    return [x_key, *columns], (config["x_axis"], frequency, *columns)
+
+
+def build_chart_data(
+    filtered_data: pd.DataFrame, config: dict, quantile_mode: str = "exact"
+) -> pd.DataFrame:
+    aggregation = config["aggregation"]
+    if aggregation == "None (raw rows)":
+        return filtered_data
+
+    agg_func = AGGREGATIONS[aggregation]
+    groupers, _ = _grouping(filtered_data, config)
+    grouped = filtered_data.groupby(groupers, dropna=False, observed=True, as_index=False)[
+        config["y_axis"]
+    ]
+    if agg_func not in QUANTILES:
+        return grouped.agg(agg_func)
+
+    # Group keys come from pandas; the quantiles themselves from ``quantiles``.
+    result = grouped.count()
+    result[config["y_axis"]] = group_quantiles(
+        grouped.ngroup().to_numpy(),
+        filtered_data[config["y_axis"]].to_numpy(dtype=float, na_value=np.nan),
+        len(result),
+        QUANTILES[agg_func],
+        quantile_mode,
     )
+    return result
+
+
+@dataclass(frozen=True)
+class CubePartial:
+    """Count, sum, min and max of one value column per group."""
+
+    keys: pd.DataFrame
+    count: pd.Series
+    total: pd.Series
+    minimum: pd.Series
+    maximum: pd.Series
+
+    @classmethod
+    def build(cls, filtered_data: pd.DataFrame, groupers: list, y_axis: str) -> CubePartial:
+        grouped = filtered_data.groupby(groupers, dropna=False, observed=True, as_index=False)[
+            y_axis
+        ]
+        counts = grouped.count()
+        return cls(
+            keys=counts.drop(columns=y_axis),
+            count=counts[y_axis],
+            total=grouped.sum()[y_axis],
+            minimum=grouped.min()[y_axis],
+            maximum=grouped.max()[y_axis],
+        )
+
+    def subset(self, column: str, values: Iterable[str], regroup: bool) -> CubePartial:
+        """Partial for the groups whose ``column`` value, as a string, is in ``values``.
+
+        With ``regroup`` the groups are merged over ``column``: counts and sums
+        add up, minima and maxima combine, matching a rescan of those rows.
+        """
+        labels = self.keys[column]
+        mask = (labels.notna() & labels.astype(str).isin(list(values))).to_numpy()
+        keys = self.keys[mask].reset_index(drop=True)
+        measures = pd.DataFrame(
+            {
+                "count": self.count.to_numpy()[mask],
+                "total": self.total.to_numpy()[mask],
+                "minimum": self.minimum.to_numpy()[mask],
+                "maximum": self.maximum.to_numpy()[mask],
+            }
+        )
+        if regroup:
+            merged = measures.groupby(
+                [keys[name] for name in keys.columns if name != column],
+                dropna=False,
+                observed=True,
+            ).agg({"count": "sum", "total": "sum", "minimum": "min", "maximum": "max"})
+            keys = merged.index.to_frame(index=False)
+            measures = merged.reset_index(drop=True)
+        return CubePartial(
+            keys=keys,
+            count=measures["count"],
+            total=measures["total"],
+            minimum=measures["minimum"],
+            maximum=measures["maximum"],
+        )
+
+    def serve(self, agg_func: str, y_axis: str) -> pd.DataFrame:
+        if agg_func == "mean":
+            values = self.total / self.count.where(self.count > 0)
+        else:
+            values = {
+                "count": self.count,
+                "sum": self.total,
+                "min": self.minimum,
+                "max": self.maximum,
+            }[agg_func]
+        return self.keys.assign(**{y_axis: values.to_numpy()})
+
+
+class AggregationCube:
+    """Serve Count/Sum/Mean/Min/Max chart data from cached group partials.
+
+    ``partials`` holds one ``CubePartial`` per dataset, filtered row set,
+    grouping-key set and value column, so switching between those five
+    aggregations only derives a column from the cached partial. Raw rows and
+    quantiles still go through ``build_chart_data``.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.partials: LruCache[CubePartial] = LruCache(max_entries)
+
+    def chart_data(
+        self,
+        filtered_data: pd.DataFrame,
+        config: dict,
+        rows_key: tuple[Hashable, ...],
+        quantile_mode: str = "exact",
+    ) -> pd.DataFrame:
+        """``build_chart_data`` for ``filtered_data``, whose rows ``rows_key`` identifies.
+
+        ``rows_key`` must start with the dataset handle so ``discard`` can find it.
+        """
+        agg_func = AGGREGATIONS[config["aggregation"]]
+        if agg_func is None or agg_func in QUANTILES:
+            return build_chart_data(filtered_data, config, quantile_mode)
+
+        groupers, signature = _grouping(filtered_data, config)
+        partial = self.partials.get_or_compute(
+            (*rows_key, signature, config["y_axis"]),
+            lambda: CubePartial.build(filtered_data, groupers, config["y_axis"]),
+        )
+        return partial.serve(agg_func, config["y_axis"])
+
+    def title_subset_data(
+        self,
+        parent_data: Callable[[], pd.DataFrame],
+        config: dict,
+        parent_key: tuple[Hashable, ...],
+        title_column: str,
+        title_values: Iterable[str],
+    ) -> pd.DataFrame | None:
+        """Chart data for the rows of ``parent_data`` whose ``title_column`` is in ``title_values``.
+
+        The rows before the title filter are grouped once by ``title_column``
+        plus the chart's own keys; every title subset of them is then merged
+        from that partial without rescanning rows. Returns None when the
+        chart can't be served that way (raw rows, quantiles, auto buckets whose
+        width depends on the subset, or titles on the x- or y-axis).
+        """
+        agg_func = AGGREGATIONS[config["aggregation"]]
+        if (
+            agg_func is None
+            or agg_func in QUANTILES
+            or config["time_bucket"] == "auto"
+            or title_column in (config["x_axis"], config["y_axis"])
+        ):
+            return None
+
+        columns = _group_columns(config)
+        regroup = title_column not in columns
+
+        def _build() -> CubePartial:
+            data = parent_data()
+            groupers, _ = _grouping(data, config)
+            return CubePartial.build(
+                data, [*groupers, title_column] if regroup else groupers, config["y_axis"]
+            )
+
+        partial = self.partials.get_or_compute(
+            (
+                *parent_key,
+                "by",
+                title_column,
+                (config["x_axis"], config["time_bucket"], *columns),
+                config["y_axis"],
+            ),
+            _build,
+        )
+        return partial.subset(title_column, title_values, regroup).serve(
+            agg_func, config["y_axis"]
+        )
+
+    def discard(self, dataset_key: str) -> None:
+        self.partials.discard_where(lambda key: key[0] == dataset_key)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+import tempfile
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 
 import pandas as pd
 import dash_bootstrap_components as dbc
 from dash import (
     Dash,
+    DiskcacheManager,
     Input,
     Output,
     State,
@@ -15,12 +21,44 @@ from dash import (
     html,
     no_update,
 )
-from dash.dependencies import ALL
+from dash.dependencies import ALL, MATCH
 
-from aggregation import build_chart_data
+from aggregation import AGGREGATIONS, AggregationCube, chart_columns
+from binning import rasterize
 from data_loader import CsvDataLoader
+from dataset_registry import DatasetRegistry
+from downsampling import downsample
 from filters import DataFilter, FilterConfig
-from visualization import ChartBuilder
+from preview import DEFAULT_PAGE_SIZE, PreviewTable
+from quantiles import QUANTILE_MODES
+from settings import AppSettings
+from visualization import ChartBuilder, ChartConfig
+
+
+# Chart controls whose changes are sent as partial layout updates.
+LAYOUT_CONTROL_TYPES = {"layout-height"}
+# Per-chart (component type, property) pairs, in ``_chart_configs`` argument order.
+CHART_CONTROLS = (
+    ("chart-filter-title-column", "value"),
+    ("chart-filter-title-values", "value"),
+    ("chart-filter-time-column", "value"),
+    ("chart-filter-time-range", "start_date"),
+    ("chart-filter-time-range", "end_date"),
+    ("chart-type", "value"),
+    ("x-axis", "value"),
+    ("y-axis", "value"),
+    ("aggregation", "value"),
+    ("time-bucket", "value"),
+    ("color-dimension", "value"),
+    ("line-symbol", "value"),
+    ("line-dash", "value"),
+    ("bar-pattern", "value"),
+    ("bar-facet", "value"),
+    ("downsampling", "value"),
+    ("point-budget", "value"),
+    ("render-mode", "value"),
+    ("layout-height", "value"),
+)
 
 
 @dataclass(frozen=True)
@@ -29,6 +67,8 @@ class ComponentIds:
     datasets_store: str = "datasets-store"
     data_store: str = "data-store"
     upload_info: str = "upload-info"
+    upload_progress: str = "upload-progress"
+    upload_poll: str = "upload-poll"
     dataset_selector: str = "dataset-selector"
     delete_dataset: str = "delete-dataset"
     title_column: str = "title-column"
@@ -39,17 +79,56 @@ class ComponentIds:
     add_chart: str = "add-chart"
     charts_container: str = "charts-container"
     data_preview: str = "data-preview"
+    filter_store: str = "filter-store"
+    chart_progress: str = "chart-progress"
+    cancel_charts: str = "cancel-charts"
 
 
 class DashboardApp:
     """Dash app for CSV exploration."""
 
-    def __init__(self) -> None:
+    def __init__(self, settings: AppSettings | None = None) -> None:
+        self.settings = settings or AppSettings.from_env()
+        if self.settings.quantile_mode not in QUANTILE_MODES:
+            raise ValueError(
+                f"Unknown quantile mode {self.settings.quantile_mode!r}; "
+                f"expected one of {QUANTILE_MODES}."
+            )
         self.ids = ComponentIds()
         self.app = Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
-        self.loader = CsvDataLoader()
-        self.data_filter = DataFilter()
-        self.chart_builder = ChartBuilder()
+        self.loader = CsvDataLoader(
+            engine=self.settings.csv_engine,
+            chunk_rows=self.settings.stream_chunk_rows,
+            compact=self.settings.compact_dtypes,
+        )
+        self._upload_progress: dict[str, tuple[float, int]] = {}
+        self.registry = DatasetRegistry(
+            memory_budget_bytes=self.settings.dataset_memory_budget_mb * 1024 * 1024,
+            idle_expire_seconds=self.settings.dataset_idle_expire_s,
+        )
+        self.data_filter = DataFilter(
+            dataset_source=self.registry.get,
+            result_cache_entries=self.settings.filter_cache_entries,
+            result_cache_bytes=self.settings.filter_cache_mb * 1024 * 1024,
+        )
+        self.aggregation_cube = AggregationCube(self.settings.cube_cache_entries)
+        self.preview_table = PreviewTable(self.data_filter, self.settings.preview_cache_entries)
+        self.chart_builder = ChartBuilder(
+            figure_cache_entries=self.settings.figure_cache_entries,
+            webgl_threshold=self.settings.webgl_threshold,
+        )
+        # Caches derived from a dataset are dropped when its frame leaves memory.
+        self.registry.on_evict.extend(
+            [
+                self.data_filter.discard,
+                self.aggregation_cube.discard,
+                self.preview_table.discard,
+                self.chart_builder.discard,
+            ]
+        )
+        self.chart_executor = self._make_chart_executor()
+        self._launch_id = uuid.uuid4().hex
+        self.background_manager = self._make_background_manager()
         self.app.layout = self._build_layout()
         self._register_callbacks()
 
@@ -106,6 +185,15 @@ class DashboardApp:
                                                 html.Div(
                                                     id=self.ids.upload_info, className="hint"
                                                 ),
+                                                html.Div(
+                                                    id=self.ids.upload_progress,
+                                                    className="hint",
+                                                ),
+                                                dcc.Interval(
+                                                    id=self.ids.upload_poll,
+                                                    interval=500,
+                                                    disabled=True,
+                                                ),
                                                 html.Label("Select dataset"),
                                                 dcc.Dropdown(
                                                     id=self.ids.dataset_selector,
@@ -197,6 +285,7 @@ class DashboardApp:
                                                 justify="between",
                                                 children=[
                                                     dbc.Col(html.H2("3) Build charts")),
+                                                    *self._background_controls(),
                                                     dbc.Col(
                                                         dbc.Button(
                                                             "Add chart",
@@ -221,7 +310,14 @@ class DashboardApp:
                                                 children=[
                                                     dash_table.DataTable(
                                                         id=self.ids.data_preview,
-                                                        page_size=10,
+                                                        page_current=0,
+                                                        page_size=DEFAULT_PAGE_SIZE,
+                                                        page_action="custom",
+                                                        sort_action="custom",
+                                                        sort_mode="multi",
+                                                        sort_by=[],
+                                                        filter_action="custom",
+                                                        filter_query="",
                                                         style_table={"overflowX": "auto"},
                                                         style_header={
                                                             "backgroundColor": "#f1f5f9",
@@ -245,6 +341,7 @@ class DashboardApp:
                 ),
                 dcc.Store(id=self.ids.datasets_store, data={}),
                 dcc.Store(id=self.ids.data_store),
+                dcc.Store(id=self.ids.filter_store),
                 dcc.Store(id=self.ids.chart_count, data=1),
             ],
         )
@@ -264,6 +361,279 @@ class DashboardApp:
                 return candidate
             counter += 1
 
+    def _chart_configs(
+        self,
+        chart_title_column: str | None,
+        chart_title_values: list[str] | None,
+        chart_time_column: str | None,
+        chart_start_date: str | None,
+        chart_end_date: str | None,
+        chart_type: str,
+        x_axis: str,
+        y_axis: str,
+        aggregation: str,
+        time_bucket: str,
+        color_dimension: str,
+        line_symbol: str,
+        line_dash: str,
+        bar_pattern: str,
+        bar_facet: str,
+        downsampling: str,
+        point_budget: int | None,
+        render_mode: str,
+        layout_height: int,
+    ) -> tuple[FilterConfig, ChartConfig]:
+        """Per-chart filter and chart settings from control values in ``CHART_CONTROLS`` order."""
+        per_chart_config = FilterConfig(
+            title_column=chart_title_column,
+            title_values=tuple(chart_title_values or ()),
+            time_column=chart_time_column,
+            start_date=chart_start_date,
+            end_date=chart_end_date,
+        )
+        chart_config = self.chart_builder.to_config(
+            chart_type=chart_type,
+            x_axis=x_axis,
+            y_axis=y_axis,
+            aggregation=aggregation,
+            time_bucket=time_bucket,
+            color_dimension=color_dimension,
+            line_symbol=line_symbol,
+            line_dash=line_dash,
+            bar_pattern=bar_pattern,
+            bar_facet=bar_facet,
+            downsampling=downsampling,
+            point_budget=point_budget,
+            render_mode=render_mode,
+            layout_height=layout_height,
+        )
+        return per_chart_config, chart_config
+
+    def _render_chart(
+        self,
+        filter_state: dict,
+        per_chart_config: FilterConfig,
+        chart_config: ChartConfig,
+        x_range: tuple | None,
+        report: Callable[[str], None] | None = None,
+    ) -> tuple[dict, str]:
+        """Serialized figure and render note for one chart.
+
+        ``report`` is called with the name of each stage as it starts.
+        """
+        report = report or (lambda stage: None)
+        filter_state = dict(filter_state)
+        data_handle = filter_state.pop("dataset")
+        data = self.registry.get(data_handle)
+        if data is None:
+            return {}, ""
+        global_config = FilterConfig(**filter_state)
+        x_range = self._requery_range(data, data_handle, chart_config, x_range)
+
+        def _chart_data() -> pd.DataFrame:
+            report("filtering rows")
+            rows = self.data_filter.select(data, global_config, data_handle)
+            time_columns = [global_config.time_column, per_chart_config.time_column]
+            if chart_config.time_bucket != "none" and self.data_filter.parses_as_datetime(
+                data, chart_config.x_axis, data_handle
+            ):
+                # Buckets are taken from the cached datetime form of the x column.
+                time_columns.append(chart_config.x_axis)
+            # Only the columns the chart reads are gathered for its rows.
+            columns = chart_columns(chart_config.__dict__)
+
+            report("aggregating")
+            chart_data = None
+            if x_range is None and self._filters_titles_only(per_chart_config):
+                # Title subsets merge partials grouped over the globally filtered rows.
+                chart_data = self.aggregation_cube.title_subset_data(
+                    lambda: self.data_filter.take(
+                        data,
+                        rows,
+                        data_handle,
+                        time_columns,
+                        [*columns, per_chart_config.title_column],
+                    ),
+                    chart_config.__dict__,
+                    (data_handle, global_config),
+                    per_chart_config.title_column,
+                    per_chart_config.title_values,
+                )
+            if chart_data is None:
+                chart_rows = self.data_filter.select(
+                    data, per_chart_config, data_handle, rows, rows_key=global_config
+                )
+                if x_range is not None:
+                    chart_rows = self.data_filter.select_range(
+                        data,
+                        chart_config.x_axis,
+                        *x_range,
+                        data_handle,
+                        chart_rows,
+                        rows_key=(global_config, per_chart_config),
+                    )
+                chart_filtered = self.data_filter.take(
+                    data, chart_rows, data_handle, time_columns, columns
+                )
+                chart_data = self.aggregation_cube.chart_data(
+                    chart_filtered,
+                    chart_config.__dict__,
+                    (data_handle, global_config, per_chart_config, x_range),
+                    self.settings.quantile_mode,
+                )
+            report("building figure")
+            if chart_config.chart_type == "Heatmap":
+                return rasterize(
+                    chart_data,
+                    chart_config.x_axis,
+                    chart_config.y_axis,
+                    AGGREGATIONS[chart_config.aggregation],
+                    self.settings.heatmap_bins,
+                    self.settings.quantile_mode,
+                )
+            if chart_config.chart_type != "Line":
+                return chart_data
+            return downsample(
+                chart_data,
+                chart_config.x_axis,
+                chart_config.y_axis,
+                [
+                    column
+                    for column in (
+                        chart_config.color_dimension,
+                        chart_config.line_symbol,
+                        chart_config.line_dash,
+                    )
+                    if column != "(none)"
+                ],
+                chart_config.downsampling,
+                chart_config.point_budget,
+            )
+
+        figure = self.chart_builder.cached_figure(
+            (data_handle, global_config, per_chart_config, x_range),
+            chart_config,
+            _chart_data,
+        )
+        return figure, self.chart_builder.render_info(figure)
+
+    def _make_chart_executor(self) -> ThreadPoolExecutor:
+        workers = self.settings.chart_workers or min(8, os.cpu_count() or 1)
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chart")
+
+    def _make_background_manager(self) -> DiskcacheManager | None:
+        """Job manager for background chart callbacks, or None when they are off.
+
+        This is not a drop-in replacement for the default mode. Each job runs
+        in a process forked from the server, starting from the datasets and
+        caches the server holds at that moment, and nothing it computes (typed
+        columns, indexes, filter results, cube partials, figures) comes back.
+        Every chart update therefore recomputes from the server's state; only
+        identical repeats are answered from the on-disk result cache, kept
+        until it expires. Use it to keep slow charts off the request threads,
+        not to make charts faster. The app's own locks are held across each
+        fork (see ``caching.guard_across_fork``) so a job never inherits one
+        mid-update.
+        """
+        if not self.settings.background_charts:
+            return None
+        try:
+            import diskcache
+            import multiprocess  # noqa: F401
+            import psutil  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "CSV_INSIGHT_BACKGROUND_CHARTS requires the diskcache, multiprocess and "
+                "psutil packages; install them with pip install 'dash[diskcache]'."
+            ) from exc
+        directory = self.settings.background_cache_dir or os.path.join(
+            tempfile.gettempdir(), "csv-insight-callbacks"
+        )
+        return DiskcacheManager(
+            diskcache.Cache(directory),
+            # Results from an earlier server run are never reused.
+            cache_by=[lambda: self._launch_id],
+            expire=self.settings.background_cache_expire_s,
+        )
+
+    def _background_controls(self) -> list:
+        if self.background_manager is None:
+            return []
+        return [
+            dbc.Col(
+                [
+                    html.Span(id=self.ids.chart_progress, className="hint me-2"),
+                    dbc.Button(
+                        "Cancel",
+                        id=self.ids.cancel_charts,
+                        color="secondary",
+                        outline=True,
+                    ),
+                ],
+                width="auto",
+            )
+        ]
+
+    @staticmethod
+    def _preview_columns(data: pd.DataFrame, time_column: str | None) -> list[dict]:
+        """DataTable columns; their type picks the default operator of each filter cell."""
+        columns = []
+        for column in data.columns:
+            series = data[column]
+            if column == time_column or pd.api.types.is_datetime64_any_dtype(series):
+                kind = "datetime"
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                kind = "numeric"
+            else:
+                kind = "text"
+            columns.append({"name": column, "id": column, "type": kind})
+        return columns
+
+    @staticmethod
+    def _filters_titles_only(config: FilterConfig) -> bool:
+        has_titles = bool(config.title_column and config.title_values)
+        has_time_range = bool(config.time_column and config.start_date and config.end_date)
+        return has_titles and not has_time_range
+
+    @staticmethod
+    def _zoomed_x_range(relayout_data: dict) -> tuple | None:
+        """The x-axis window from a graph's ``relayoutData``, or None when unzoomed."""
+        if relayout_data.get("xaxis.autorange"):
+            return None
+        if "xaxis.range[0]" in relayout_data and "xaxis.range[1]" in relayout_data:
+            return relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+        if isinstance(relayout_data.get("xaxis.range"), list):
+            low, high = relayout_data["xaxis.range"]
+            return low, high
+        return None
+
+    def _requery_range(
+        self,
+        data: pd.DataFrame,
+        data_handle: str,
+        chart_config: ChartConfig,
+        x_range: tuple | None,
+    ) -> tuple | None:
+        """``x_range`` when a zoom can be re-queried at full resolution, else None.
+
+        Only line charts on numeric or datetime x columns qualify; on text and
+        categorical axes plotly reports category positions, not values.
+        """
+        if x_range is None or chart_config.chart_type != "Line":
+            return None
+        series = data[chart_config.x_axis]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            numeric = all(
+                isinstance(bound, (int, float)) and not isinstance(bound, bool)
+                for bound in x_range
+            )
+            return x_range if numeric else None
+        if not all(isinstance(bound, str) for bound in x_range):
+            return None
+        if self.data_filter.parses_as_datetime(data, chart_config.x_axis, data_handle):
+            return x_range
+        return None
+
     def _register_callbacks(self) -> None:
         ids = self.ids
 
@@ -276,6 +646,10 @@ class DashboardApp:
             State(ids.upload, "filename"),
             State(ids.datasets_store, "data"),
             State(ids.dataset_selector, "value"),
+            running=[
+                (Output(ids.upload_poll, "disabled"), False, True),
+                (Output(ids.upload_progress, "children"), "Parsing upload...", ""),
+            ],
             prevent_initial_call=True,
         )
         def _update_datasets(
@@ -290,7 +664,8 @@ class DashboardApp:
 
             if triggered == ids.delete_dataset:
                 if selected_dataset and selected_dataset in datasets:
-                    datasets.pop(selected_dataset)
+                    handle = datasets.pop(selected_dataset)
+                    self.registry.release(handle)
                     remaining = list(datasets.keys())
                     return datasets, (remaining[0] if remaining else None), ""
                 return datasets, selected_dataset, ""
@@ -298,7 +673,15 @@ class DashboardApp:
             if triggered == ids.upload:
                 if not contents:
                     return datasets, selected_dataset, ""
-                payload = self.loader.parse_contents(contents, filename)
+                progress_key = filename or "uploaded.csv"
+
+                def _report(fraction: float, rows: int) -> None:
+                    self._upload_progress[progress_key] = (fraction, rows)
+
+                try:
+                    payload = self.loader.parse_contents(contents, filename, on_progress=_report)
+                finally:
+                    self._upload_progress.pop(progress_key, None)
                 if payload.error:
                     return datasets, selected_dataset, payload.error
                 if payload.dataframe is None or payload.dataframe.empty:
@@ -307,13 +690,33 @@ class DashboardApp:
                     filename or "uploaded.csv",
                     datasets,
                 )
-                datasets[dataset_name] = payload.dataframe.to_json(
-                    date_format="iso", orient="split"
-                )
-                return datasets, dataset_name, ""
+                datasets[dataset_name] = self.registry.register(payload.dataframe)
+                notes = []
+                if payload.chunks > 1:
+                    notes.append(
+                        f"Loaded {len(payload.dataframe):,} rows in {payload.chunks} chunks."
+                    )
+                if payload.bytes_saved:
+                    notes.append(
+                        f"Compacted dtypes, saving {payload.bytes_saved / 1024 ** 2:,.1f} MB."
+                    )
+                return datasets, dataset_name, " ".join(notes)
 
             return no_update, no_update, ""
 
+        @self.app.callback(
+            Output(ids.upload_progress, "children", allow_duplicate=True),
+            Input(ids.upload_poll, "n_intervals"),
+            State(ids.upload, "filename"),
+            prevent_initial_call=True,
+        )
+        def _show_upload_progress(n_intervals: int | None, filename: str | None):
+            progress = self._upload_progress.get(filename or "uploaded.csv")
+            if progress is None:
+                return no_update
+            fraction, rows = progress
+            return f"Parsing upload... {fraction:.0%} ({rows:,} rows)"
+
         @self.app.callback(
             Output(ids.dataset_selector, "options"),
             Input(ids.datasets_store, "data"),
@@ -324,13 +727,27 @@ class DashboardApp:
 
         @self.app.callback(
             Output(ids.data_store, "data"),
+            Output(ids.datasets_store, "data", allow_duplicate=True),
+            Output(ids.dataset_selector, "value", allow_duplicate=True),
+            Output(ids.upload_info, "children", allow_duplicate=True),
             Input(ids.datasets_store, "data"),
             Input(ids.dataset_selector, "value"),
+            prevent_initial_call=True,
         )
         def _sync_selected_dataset(datasets: dict, selected_name: str | None):
             if not datasets or not selected_name or selected_name not in datasets:
-                return None
-            return datasets[selected_name]
+                return None, no_update, no_update, no_update
+            # Idle datasets expire on the server while the page still lists them.
+            expired = [name for name, handle in datasets.items() if handle not in self.registry]
+            if not expired:
+                return datasets[selected_name], no_update, no_update, no_update
+            datasets = {
+                name: handle for name, handle in datasets.items() if name not in expired
+            }
+            if selected_name not in datasets:
+                selected_name = next(iter(datasets), None)
+            note = f"{', '.join(expired)} expired after being idle; please re-upload."
+            return datasets.get(selected_name), datasets, selected_name, note
 
         @self.app.callback(
             Output(ids.title_column, "options"),
@@ -339,10 +756,10 @@ class DashboardApp:
             Output(ids.time_column, "value"),
             Input(ids.data_store, "data"),
         )
-        def _update_column_options(data_json: str | None):
-            if not data_json:
+        def _update_column_options(data_handle: str | None):
+            data = self.registry.get(data_handle)
+            if data is None:
                 return [], None, [], None
-            data = pd.read_json(data_json, orient="split")
             options = [{"label": col, "value": col} for col in data.columns]
             return options, None, options, None
 
@@ -352,10 +769,10 @@ class DashboardApp:
             Input(ids.title_column, "value"),
             Input(ids.data_store, "data"),
         )
-        def _update_title_values(title_column: str | None, data_json: str | None):
-            if not data_json or not title_column:
+        def _update_title_values(title_column: str | None, data_handle: str | None):
+            data = self.registry.get(data_handle)
+            if data is None or not title_column:
                 return [], []
-            data = pd.read_json(data_json, orient="split")
             values = self.data_filter.unique_values(data[title_column])
             return [{"label": v, "value": v} for v in values], values[:10]
 
@@ -367,11 +784,13 @@ class DashboardApp:
             Input(ids.time_column, "value"),
             Input(ids.data_store, "data"),
         )
-        def _update_time_range(time_column: str | None, data_json: str | None):
-            if not data_json or not time_column:
+        def _update_time_range(time_column: str | None, data_handle: str | None):
+            data = self.registry.get(data_handle)
+            if data is None or not time_column:
                 return None, None, None, None
-            data = pd.read_json(data_json, orient="split")
-            min_time, max_time = self.data_filter.datetime_bounds(data[time_column])
+            min_time, max_time = self.data_filter.datetime_bounds(
+                data, time_column, data_handle
+            )
             if not min_time or not max_time:
                 return None, None, None, None
             return (
@@ -397,10 +816,10 @@ class DashboardApp:
             Input(ids.chart_count, "data"),
             Input(ids.data_store, "data"),
         )
-        def _render_charts(count: int, data_json: str | None):
-            if not data_json:
+        def _render_charts(count: int, data_handle: str | None):
+            data = self.registry.get(data_handle)
+            if data is None:
                 return html.Div("Upload a CSV to configure charts.")
-            data = pd.read_json(data_json, orient="split")
             numeric_columns = [
                 col for col in data.columns if pd.api.types.is_numeric_dtype(data[col])
             ]
@@ -418,114 +837,188 @@ class DashboardApp:
             ]
 
         @self.app.callback(
-            Output({"type": "chart-graph", "index": ALL}, "figure"),
-            Output(ids.data_preview, "data"),
-            Output(ids.data_preview, "columns"),
+            Output(ids.filter_store, "data"),
             Input(ids.data_store, "data"),
             Input(ids.title_column, "value"),
             Input(ids.title_values, "value"),
             Input(ids.time_column, "value"),
             Input(ids.time_range, "start_date"),
             Input(ids.time_range, "end_date"),
-            Input({"type": "chart-filter-title-column", "index": ALL}, "value"),
-            Input({"type": "chart-filter-title-values", "index": ALL}, "value"),
-            Input({"type": "chart-filter-time-column", "index": ALL}, "value"),
-            Input({"type": "chart-filter-time-range", "index": ALL}, "start_date"),
-            Input({"type": "chart-filter-time-range", "index": ALL}, "end_date"),
-            Input({"type": "chart-type", "index": ALL}, "value"),
-            Input({"type": "x-axis", "index": ALL}, "value"),
-            Input({"type": "y-axis", "index": ALL}, "value"),
-            Input({"type": "aggregation", "index": ALL}, "value"),
-            Input({"type": "color-dimension", "index": ALL}, "value"),
-            Input({"type": "line-symbol", "index": ALL}, "value"),
-            Input({"type": "line-dash", "index": ALL}, "value"),
-            Input({"type": "bar-pattern", "index": ALL}, "value"),
-            Input({"type": "bar-facet", "index": ALL}, "value"),
-            Input({"type": "layout-height", "index": ALL}, "value"),
         )
-        def _update_charts(
-            data_json: str | None,
+        def _update_global_filter(
+            data_handle: str | None,
             title_column: str | None,
             title_values: list[str] | None,
             time_column: str | None,
             start_date: str | None,
             end_date: str | None,
-            chart_title_columns: list[str | None],
-            chart_title_values: list[list[str] | None],
-            chart_time_columns: list[str | None],
-            chart_start_dates: list[str | None],
-            chart_end_dates: list[str | None],
-            chart_types: list[str],
-            x_axes: list[str],
-            y_axes: list[str],
-            aggregations: list[str],
-            color_dimensions: list[str],
-            line_symbols: list[str],
-            line_dashes: list[str],
-            bar_patterns: list[str],
-            bar_facets: list[str],
-            layout_heights: list[int],
         ):
-            if not data_json:
-                return [], [], []
+            if self.registry.get(data_handle) is None:
+                return None
 
-            data = pd.read_json(data_json, orient="split")
             global_config = FilterConfig(
                 title_column=title_column,
-                title_values=title_values or [],
+                title_values=tuple(title_values or ()),
                 time_column=time_column,
                 start_date=start_date,
                 end_date=end_date,
             )
-            filtered = self.data_filter.apply(data, global_config)
-            preview_columns = [{"name": col, "id": col} for col in filtered.columns]
-            preview_data = filtered.head(50).to_dict("records")
-
-            figures = []
-            for index in range(len(chart_types)):
-                chart_filtered = filtered
-                per_chart_config = FilterConfig(
-                    title_column=(
-                        chart_title_columns[index]
-                        if index < len(chart_title_columns)
-                        else None
-                    ),
-                    title_values=(
-                        chart_title_values[index]
-                        if index < len(chart_title_values)
-                        else []
-                    ),
-                    time_column=(
-                        chart_time_columns[index]
-                        if index < len(chart_time_columns)
-                        else None
-                    ),
-                    start_date=(
-                        chart_start_dates[index]
-                        if index < len(chart_start_dates)
-                        else None
-                    ),
-                    end_date=(
-                        chart_end_dates[index] if index < len(chart_end_dates) else None
-                    ),
-                )
-                chart_filtered = self.data_filter.apply(chart_filtered, per_chart_config)
-                chart_config = self.chart_builder.to_config(
-                    chart_type=chart_types[index],
-                    x_axis=x_axes[index],
-                    y_axis=y_axes[index],
-                    aggregation=aggregations[index],
-                    color_dimension=color_dimensions[index],
-                    line_symbol=line_symbols[index],
-                    line_dash=line_dashes[index],
-                    bar_pattern=bar_patterns[index],
-                    bar_facet=bar_facets[index],
-                    layout_height=layout_heights[index],
+            return {"dataset": data_handle, **asdict(global_config)}
+
+        @self.app.callback(
+            Output(ids.data_preview, "data"),
+            Output(ids.data_preview, "columns"),
+            Output(ids.data_preview, "page_count"),
+            Output(ids.data_preview, "page_current"),
+            Input(ids.filter_store, "data"),
+            Input(ids.data_preview, "page_current"),
+            Input(ids.data_preview, "page_size"),
+            Input(ids.data_preview, "sort_by"),
+            Input(ids.data_preview, "filter_query"),
+        )
+        def _update_preview(
+            filter_state: dict | None,
+            page_current: int | None,
+            page_size: int | None,
+            sort_by: list[dict] | None,
+            filter_query: str | None,
+        ):
+            # Only the visible page is built and sent; the filtered and sorted
+            # row order behind it is cached by the preview table.
+            if not filter_state:
+                return [], [], 1, 0
+            filter_state = dict(filter_state)
+            data_handle = filter_state.pop("dataset")
+            data = self.registry.get(data_handle)
+            if data is None:
+                return [], [], 1, 0
+            global_config = FilterConfig(**filter_state)
+            if f"{ids.data_preview}.page_current" not in callback_context.triggered_prop_ids:
+                # A new selection, filter or sort starts again from the first page.
+                page_current = 0
+
+            columns = self._preview_columns(data, global_config.time_column)
+            rows = self.data_filter.select(data, global_config, data_handle)
+            try:
+                page, page_count = self.preview_table.page(
+                    data,
+                    rows,
+                    data_handle,
+                    global_config,
+                    filter_query,
+                    sort_by,
+                    page_current or 0,
+                    page_size or DEFAULT_PAGE_SIZE,
+                    [global_config.time_column],
                 )
-                chart_data = build_chart_data(chart_filtered, chart_config.__dict__)
-                figures.append(self.chart_builder.build_figure(chart_data, chart_config))
+            except ValueError:
+                # A filter the table cannot apply shows no rows until it is edited.
+                return [], columns, 1, 0
+            return page.to_dict("records"), columns, page_count, page_current or 0
 
-            return figures, preview_data, preview_columns
+        filter_dependency = State(ids.filter_store, "data")
+        background_options = {}
+        if self.background_manager is not None:
+            # Every chart is its own background job, so a global filter change
+            # triggers them directly rather than through ``_refresh_charts``.
+            # Dash cancels a chart's running job when its inputs change again.
+            filter_dependency = Input(ids.filter_store, "data")
+            background_options = dict(
+                background=True,
+                manager=self.background_manager,
+                progress=Output(ids.chart_progress, "children"),
+                progress_default="",
+                cancel=[Input(ids.cancel_charts, "n_clicks"), Input(ids.data_store, "data")],
+                # Height changes return a layout patch, so the trigger is part
+                # of the cache key.
+                cache_ignore_triggered=False,
+            )
+
+        @self.app.callback(
+            Output({"type": "chart-graph", "index": MATCH}, "figure"),
+            Output({"type": "chart-graph", "index": MATCH}, "relayoutData"),
+            Output({"type": "chart-render-info", "index": MATCH}, "children"),
+            *[Input({"type": kind, "index": MATCH}, prop) for kind, prop in CHART_CONTROLS],
+            Input({"type": "chart-graph", "index": MATCH}, "relayoutData"),
+            filter_dependency,
+            State(ids.data_store, "data"),
+            **background_options,
+        )
+        def _update_chart(*values):
+            report = None
+            if self.background_manager is not None:
+                set_progress, *values = values
+                chart_number = callback_context.outputs_list[0]["id"]["index"] + 1
+
+                def report(stage: str) -> None:
+                    set_progress(f"Chart {chart_number}: {stage}...")
+
+            *controls, relayout_data, filter_state, data_handle = values
+            if not filter_state:
+                return {}, no_update, ""
+            if filter_state["dataset"] != data_handle:
+                # Cards for a newly selected dataset can render before the
+                # filter store catches up; the refresh that follows draws them.
+                return no_update, no_update, no_update
+
+            per_chart_config, chart_config = self._chart_configs(*controls)
+            triggered = {
+                component.get("type") if isinstance(component, dict) else component
+                for component in callback_context.triggered_prop_ids.values()
+            }
+            if triggered and triggered <= LAYOUT_CONTROL_TYPES:
+                return self.chart_builder.layout_patch(chart_config), no_update, no_update
+
+            relayout_data = relayout_data or {}
+            if triggered == {"chart-graph"} and not any(
+                key.startswith("xaxis.") for key in relayout_data
+            ):
+                return no_update, no_update, no_update
+            # A zoom window belongs to the x column it was drawn on.
+            zoom_reset = "x-axis" in triggered and bool(relayout_data)
+            x_range = None if zoom_reset else self._zoomed_x_range(relayout_data)
+
+            figure, render_info = self._render_chart(
+                filter_state, per_chart_config, chart_config, x_range, report
+            )
+            return figure, None if zoom_reset else no_update, render_info
+
+        if self.background_manager is None:
+
+            @self.app.callback(
+                Output({"type": "chart-graph", "index": ALL}, "figure", allow_duplicate=True),
+                Output(
+                    {"type": "chart-render-info", "index": ALL}, "children", allow_duplicate=True
+                ),
+                Input(ids.filter_store, "data"),
+                *[State({"type": kind, "index": ALL}, prop) for kind, prop in CHART_CONTROLS],
+                State({"type": "chart-graph", "index": ALL}, "relayoutData"),
+                State(ids.data_store, "data"),
+                prevent_initial_call=True,
+            )
+            def _refresh_charts(filter_state: dict | None, *values):
+                # A new global filter redraws every chart; they are computed side
+                # by side on the chart executor and returned in layout order.
+                *controls, relayouts, data_handle = values
+                if filter_state and filter_state["dataset"] != data_handle:
+                    return [no_update] * len(relayouts), [no_update] * len(relayouts)
+
+                def _render(index: int) -> tuple[dict, str]:
+                    if not filter_state:
+                        return {}, ""
+                    per_chart_config, chart_config = self._chart_configs(
+                        *(control[index] for control in controls)
+                    )
+                    x_range = self._zoomed_x_range(relayouts[index] or {})
+                    try:
+                        return self._render_chart(
+                            filter_state, per_chart_config, chart_config, x_range
+                        )
+                    except Exception as exc:  # noqa: BLE001 - one chart must not block the rest
+                        return no_update, f"Could not draw this chart: {exc}"
+
+                rendered = list(self.chart_executor.map(_render, range(len(relayouts))))
+                return [figure for figure, _ in rendered], [info for _, info in rendered]
 
         @self.app.callback(
             Output({"type": "chart-filter-title-column", "index": ALL}, "options"),
@@ -533,10 +1026,10 @@ class DashboardApp:
             Input(ids.data_store, "data"),
             Input(ids.chart_count, "data"),
         )
-        def _update_chart_filter_columns(data_json: str | None, count: int):
-            if not data_json:
+        def _update_chart_filter_columns(data_handle: str | None, count: int):
+            data = self.registry.get(data_handle)
+            if data is None:
                 return [[] for _ in range(count)], [[] for _ in range(count)]
-            data = pd.read_json(data_json, orient="split")
             options = [{"label": col, "value": col} for col in data.columns]
             return [options for _ in range(count)], [options for _ in range(count)]
 
@@ -547,14 +1040,14 @@ class DashboardApp:
             Input(ids.data_store, "data"),
         )
         def _update_chart_title_values(
-            title_columns: list[str | None], data_json: str | None
+            title_columns: list[str | None], data_handle: str | None
         ):
-            if not data_json:
+            data = self.registry.get(data_handle)
+            if data is None:
                 return (
                     [[] for _ in range(len(title_columns))],
                     [[] for _ in range(len(title_columns))],
                 )
-            data = pd.read_json(data_json, orient="split")
             options_list = []
             values_list = []
             for column in title_columns:
@@ -576,16 +1069,16 @@ class DashboardApp:
             Input(ids.data_store, "data"),
         )
         def _update_chart_time_ranges(
-            time_columns: list[str | None], data_json: str | None
+            time_columns: list[str | None], data_handle: str | None
         ):
-            if not data_json:
+            data = self.registry.get(data_handle)
+            if data is None:
                 return (
                     [None for _ in range(len(time_columns))],
                     [None for _ in range(len(time_columns))],
                     [None for _ in range(len(time_columns))],
                     [None for _ in range(len(time_columns))],
                 )
-            data = pd.read_json(data_json, orient="split")
             min_dates = []
             max_dates = []
             start_dates = []
@@ -597,7 +1090,9 @@ class DashboardApp:
                     start_dates.append(None)
                     end_dates.append(None)
                     continue
-                min_time, max_time = self.data_filter.datetime_bounds(data[column])
+                min_time, max_time = self.data_filter.datetime_bounds(
+                    data, column, data_handle
+                )
                 if not min_time or not max_time:
                     min_dates.append(None)
                     max_dates.append(None)
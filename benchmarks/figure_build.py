@@ -0,0 +1,74 @@
+"""Figure construction time: plotly.express versus the graph_objects fast path.
+
+Run from the repository root::
+
+    python benchmarks/figure_build.py --rows 5000 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from visualization import ChartBuilder  # noqa: E402
+
+
+def make_chart_data(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="s"),
+            "machine": rng.choice([f"m{i}" for i in range(8)], rows),
+            "current": rng.normal(size=rows).cumsum(),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    data = make_chart_data(args.rows)
+    builder = ChartBuilder()
+    base = builder.default_config(list(data.columns), ["current"])
+    cases = {
+        "line": replace(base, chart_type="Line", x_axis="timestamp"),
+        "line by machine": replace(
+            base, chart_type="Line", x_axis="timestamp", color_dimension="machine"
+        ),
+        "bar": replace(base, chart_type="Bar", x_axis="machine"),
+        "bar by machine": replace(
+            base, chart_type="Bar", x_axis="timestamp", color_dimension="machine"
+        ),
+        "pie": replace(base, chart_type="Pie", x_axis="machine"),
+    }
+
+    print(f"{args.rows} rows, best of {args.repeat} builds")
+    for label, config in cases.items():
+        timings = {}
+        for fast_path in (False, True):
+            timings[fast_path] = min(
+                timeit.repeat(
+                    lambda: builder.build_figure(data, config, fast_path=fast_path),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+        print(
+            f"{label:<16} plotly.express {timings[False] * 1000:8.1f} ms"
+            f"   fast path {timings[True] * 1000:8.1f} ms"
+            f"   x{timings[False] / timings[True]:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Peak memory of one chart update: copy-per-filter versus row-position filtering.
+
+Run from the repository root::
+
+    python benchmarks/filter_memory.py --rows 2000000 --charts 8
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from filters import DataFilter, FilterConfig  # noqa: E402
+
+
+def make_dataset(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="s"),
+            "machine": pd.Categorical(rng.choice([f"m{i}" for i in range(20)], rows)),
+            "current": rng.normal(size=rows),
+            "voltage": rng.normal(size=rows),
+        }
+    )
+
+
+def copying_apply(data: pd.DataFrame, config: FilterConfig) -> pd.DataFrame:
+    """The filtering path before row positions: copy first, then mask."""
+    filtered = data.copy()
+    if config.title_column and config.title_values:
+        filtered = filtered[filtered[config.title_column].astype(str).isin(config.title_values)]
+    if config.time_column and config.start_date and config.end_date:
+        converted = pd.to_datetime(filtered[config.time_column], errors="coerce")
+        filtered = filtered.assign(**{config.time_column: converted})
+        filtered = filtered[
+            filtered[config.time_column].between(
+                pd.to_datetime(config.start_date), pd.to_datetime(config.end_date)
+            )
+        ]
+    return filtered
+
+
+def measure(label: str, update) -> None:
+    tracemalloc.start()
+    update()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} peak {peak / 1024 ** 2:10.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--charts", type=int, default=8)
+    args = parser.parse_args()
+
+    data = make_dataset(args.rows)
+    print(f"dataset {data.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB, {args.charts} charts")
+    global_config = FilterConfig(None, None, None, None, None)
+    chart_config = FilterConfig("machine", ["m1", "m2"], None, None, None)
+
+    def copying_update() -> None:
+        filtered = copying_apply(data, global_config)
+        for _ in range(args.charts):
+            copying_apply(filtered, chart_config)
+
+    data_filter = DataFilter(dataset_source={"bench": data}.get)
+
+    def positional_update() -> None:
+        rows = data_filter.select(data, global_config, "bench")
+        for _ in range(args.charts):
+            chart_rows = data_filter.select(data, chart_config, "bench", rows)
+            data_filter.take(data, chart_rows, "bench")
+
+    measure("copy per filter", copying_update)
+    measure("row positions", positional_update)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from quantiles import QUANTILES, group_quantiles
+
+DEFAULT_HEATMAP_BINS = 100
+BIN_X, BIN_Y, BIN_VALUE = "x", "y", "value"
+
+
+def _axis_bins(series: pd.Series, bins: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bin ``series`` into at most ``bins`` cells.
+
+    Returns the bin number of every row (-1 for missing values), the label of
+    each bin and a validity mask. Numeric and datetime axes are split into
+    equal-width bins labelled by their centres; anything else gets one bin per
+    distinct value.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        converted = pd.to_datetime(series)
+        if converted.dt.tz is not None:
+            converted = converted.dt.tz_convert(None)
+        values = converted.to_numpy(dtype="datetime64[ns]")
+        valid = ~np.isnat(values)
+        numeric = values.view("int64").astype(float)
+    elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = None
+        numeric = series.to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(numeric)
+    else:
+        codes, labels = pd.factorize(series, sort=True)
+        return codes, np.asarray(labels, dtype=object), codes >= 0
+
+    if not valid.any():
+        return np.full(len(series), -1), np.empty(0), valid
+    low, high = numeric[valid].min(), numeric[valid].max()
+    if high == low:
+        high = low + 1
+    edges = np.linspace(low, high, bins + 1)
+    codes = np.clip(np.searchsorted(edges, numeric, side="right") - 1, 0, bins - 1)
+    centres = (edges[:-1] + edges[1:]) / 2
+    if values is not None:
+        centres = centres.astype("int64").view("datetime64[ns]")
+    return np.where(valid, codes, -1), centres, valid
+
+
+def rasterize(
+    chart_data: pd.DataFrame,
+    x_column: str,
+    y_column: str,
+    aggregation: str | None,
+    bins: int = DEFAULT_HEATMAP_BINS,
+    quantile_mode: str = "exact",
+) -> pd.DataFrame:
+    """Aggregate ``chart_data`` onto an x/y grid, one row per non-empty cell.
+
+    ``aggregation`` is applied to the ``y_column`` values of each cell
+    (``None`` counts rows), so the result is bounded by ``bins ** 2`` rows
+    however many rows went in.
+    """
+    x_codes, x_labels, x_valid = _axis_bins(chart_data[x_column], bins)
+    y_codes, y_labels, y_valid = _axis_bins(chart_data[y_column], bins)
+    keep = x_valid & y_valid
+    cell = x_codes[keep] * len(y_labels) + y_codes[keep]
+    cells = len(x_labels) * len(y_labels)
+
+    if aggregation in (None, "count"):
+        values = np.bincount(cell, minlength=cells).astype(float)
+        occupied = values > 0
+    else:
+        weights = chart_data[y_column].to_numpy(dtype=float, na_value=np.nan)[keep]
+        counts = np.bincount(cell, minlength=cells)
+        occupied = counts > 0
+        if aggregation in ("sum", "mean"):
+            values = np.bincount(cell, weights=weights, minlength=cells)
+            if aggregation == "mean":
+                values = np.divide(values, counts, out=np.full(cells, np.nan), where=occupied)
+        elif aggregation in QUANTILES:
+            values = group_quantiles(
+                cell, weights, cells, QUANTILES[aggregation], quantile_mode
+            )
+        else:
+            reduce = np.minimum if aggregation == "min" else np.maximum
+            order = np.argsort(cell, kind="stable")
+            starts = np.flatnonzero(np.diff(cell[order], prepend=-1))
+            values = np.full(cells, np.nan)
+            if len(order):
+                values[cell[order][starts]] = reduce.reduceat(weights[order], starts)
+
+    positions = np.flatnonzero(occupied)
+    return pd.DataFrame(
+        {
+            BIN_X: x_labels[positions // len(y_labels)],
+            BIN_Y: y_labels[positions % len(y_labels)],
+            BIN_VALUE: values[positions],
+        }
+    )
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+_fork_guarded: weakref.WeakSet = weakref.WeakSet()
+_held_across_fork: list = []
+
+
+def guard_across_fork(owner: object) -> None:
+    """Hold ``owner._lock`` while the process forks.
+
+    A forked child, such as a background callback job, then never inherits
+    the lock taken or the state it guards half-updated. ``owner`` may define
+    ``_forget_in_child()`` to drop state that only the parent's threads use.
+    """
+    _fork_guarded.add(owner)
+
+
+def _acquire_before_fork() -> None:
+    _held_across_fork[:] = list(_fork_guarded)
+    for owner in _held_across_fork:
+        owner._lock.acquire()
+
+
+def _release_after_fork() -> None:
+    for owner in _held_across_fork:
+        owner._lock.release()
+    _held_across_fork.clear()
+
+
+def _release_in_child() -> None:
+    for owner in _held_across_fork:
+        if hasattr(owner, "_forget_in_child"):
+            owner._forget_in_child()
+    _release_after_fork()
+
+
+os.register_at_fork(
+    before=_acquire_before_fork,
+    after_in_parent=_release_after_fork,
+    after_in_child=_release_in_child,
+)
+
+
+def _nbytes(value: object) -> int:
+    return int(getattr(value, "nbytes", 0) or 0)
+
+
+class LruCache(Generic[V]):
+    """Thread-safe least-recently-used cache with hit/miss counters.
+
+    ``get_or_compute`` runs ``compute`` once per missing key: threads asking for
+    a key that is already being computed wait for that result instead.
+
+    With ``max_bytes`` set, the ``nbytes`` of the cached values (numpy arrays,
+    for instance) is bounded as well; a value larger than that is not cached.
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int | None = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes or None
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._entries: OrderedDict[Hashable, V] = OrderedDict()
+        self._pending: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        guard_across_fork(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: V | None = None) -> V | None:
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: V) -> None:
+        size = _nbytes(value)
+        if self.max_entries <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        self._remove(key)
+        self._entries[key] = value
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        value = self._entries.pop(key, _MISSING)
+        if value is not _MISSING:
+            self._bytes -= _nbytes(value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], V]) -> V:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
+            pending.set_exception(exc)
+            raise
+        with self._lock:
+            # A key discarded while it was computed is not stored.
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+                self._store(key, value)
+        pending.set_result(value)
+        return value
+
+    def _forget_in_child(self) -> None:
+        # The threads computing these keys exist only in the parent.
+        self._pending = {}
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop matching entries; results still being computed for them are not stored."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+            for key in [key for key in self._pending if predicate(key)]:
+                del self._pending[key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -2,25 +2,271 @@ from __future__ import annotations
 
 import base64
 import io
+import re
+from collections.abc import Callable
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
+CSV_ENGINES = ("pandas", "pyarrow")
+CATEGORY_MAX_RATIO = 0.5
+TIMESTAMP_SAMPLE_SIZE = 100
+BOOLEAN_TEXT = {
+    "True": True,
+    "TRUE": True,
+    "true": True,
+    "False": False,
+    "FALSE": False,
+    "false": False,
+}
+ISO_DATE = re.compile(r"\s*\d{4}-\d{2}-\d{2}(?:[ T]|\s*$)")
+
+ProgressCallback = Callable[[float, int], None]
+
 
 @dataclass(frozen=True)
 class CsvPayload:
     dataframe: pd.DataFrame | None
     error: str | None = None
+    chunks: int = 1
+    bytes_saved: int = 0
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def looks_like_timestamps(series: pd.Series) -> bool:
+    """Whether a short sample of ``series`` is all timestamp-like text.
+
+    Cheap enough to run before converting a whole column, which is slow for
+    text that is not dates at all.
+    """
+    sample = series.dropna().head(TIMESTAMP_SAMPLE_SIZE).astype(str)
+    if sample.empty or sample.str.len().min() < 8:
+        return False
+    try:
+        return not pd.to_datetime(sample, errors="coerce").isna().any()
+    except (TypeError, ValueError, OverflowError):
+        # Mixed UTC offsets raise even with errors="coerce".
+        return False
+
+
+def _parse_timestamps(series: pd.Series) -> pd.Series | None:
+    """``series`` as datetimes when every value is an ISO 8601 date or timestamp.
+
+    Other layouts stay text so compaction changes no value: bare times would
+    get the parse date attached and ``01/02/2024`` is ambiguous. Columns that
+    mix UTC offsets have no single datetime dtype and stay text as well.
+    """
+    sample = series.dropna().head(TIMESTAMP_SAMPLE_SIZE).astype(str)
+    if sample.empty or not sample.str.match(ISO_DATE).all():
+        return None
+    try:
+        converted = pd.to_datetime(series, format="ISO8601", errors="coerce")
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if converted.notna().sum() != series.notna().sum():
+        return None
+    return converted
+
+
+def _compact_series(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(series):
+        return series
+
+    if _is_text(series):
+        timestamps = _parse_timestamps(series)
+        if timestamps is not None:
+            return timestamps
+        if series.nunique(dropna=True) <= max(1, CATEGORY_MAX_RATIO * len(series)):
+            return series.astype("category")
+        return series
+
+    if not isinstance(series.dtype, np.dtype):
+        return series
+    if series.dtype.kind == "i":
+        return pd.to_numeric(series, downcast="integer")
+    if series.dtype.kind == "u":
+        return pd.to_numeric(series, downcast="unsigned")
+    # Floats stay float64: float32 values can be exact while their sums and
+    # means are not, and integer sums are already widened to int64.
+    return series
+
+
+def compact_dtypes(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Shrink column dtypes without changing any value.
+
+    ISO 8601 date and timestamp columns are parsed to ``datetime64``,
+    low-cardinality text becomes ``category`` and integer columns are downcast
+    to the smallest type that holds them.
+    """
+    compacted = dataframe.copy(deep=False)
+    for name in dataframe.columns:
+        series = dataframe[name]
+        converted = _compact_series(series)
+        if converted is not series:
+            compacted[name] = converted
+    return compacted
+
+
+def _type_text_column(series: pd.Series) -> pd.Series:
+    """Type a column that was read as text the way ``pd.read_csv`` infers it."""
+    present = series.notna()
+    if not present.any():
+        return series.astype(float)
+    if series[present].isin(list(BOOLEAN_TEXT)).all():
+        typed = series.map(BOOLEAN_TEXT)
+        return typed.astype(bool) if present.all() else typed.astype(object)
+    numbers = pd.to_numeric(series, errors="coerce")
+    if numbers.notna().sum() == present.sum():
+        return numbers
+    return series
+
+
+def _cast_text(values, target):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if target != pa.time32("s"):
+        return pc.cast(values, target)
+    # Arrow has no string-to-time cast, so go through a timestamp on a fixed day.
+    if not pc.all(pc.match_substring_regex(values, r"^\d{2}:\d{2}:\d{2}$")).as_py():
+        raise pa.ArrowInvalid("Not a time of day")
+    stamps = pc.cast(pc.binary_join_element_wise("1970-01-01 ", values, ""), pa.timestamp("s"))
+    return pc.cast(stamps, target)
+
+
+def _type_arrow_column(column, null_values: list[str]):
+    """Type a string column the way the Arrow CSV reader infers column types."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pc.if_else(pc.is_in(column, pa.array(null_values)), None, column)
+    if values.null_count == len(values):
+        return pa.nulls(len(values))
+    # Failed casts of a whole column are slow, so rule types out on a sample.
+    sample = pc.drop_null(values).slice(0, TIMESTAMP_SAMPLE_SIZE)
+    for target in (
+        pa.int64(),
+        pa.bool_(),
+        pa.date32(),
+        pa.time32("s"),
+        pa.timestamp("s"),
+        pa.timestamp("ns"),
+        pa.float64(),
+    ):
+        try:
+            _cast_text(sample, target)
+            return _cast_text(values, target)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+    return column
+
+
+class Base64Reader(io.RawIOBase):
+    """Readable stream that decodes ``text[start:]`` from base64 on demand.
+
+    Only one block of decoded bytes exists at a time, so a streaming parser never
+    needs the whole decoded file in memory next to the encoded upload.
+    """
+
+    def __init__(self, text: str, start: int = 0) -> None:
+        self._text = text
+        self._position = start
+        self._start = start
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    @property
+    def progress(self) -> float:
+        total = len(self._text) - self._start
+        return 1.0 if total <= 0 else (self._position - self._start) / total
+
+    def readinto(self, buffer) -> int:
+        size = len(buffer)
+        while len(self._pending) < size and self._position < len(self._text):
+            chars = max(4, (size - len(self._pending) + 2) // 3 * 4)
+            block = self._text[self._position : self._position + chars]
+            self._position += len(block)
+            self._pending += base64.b64decode(block)
+        count = min(size, len(self._pending))
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
 
 
 class CsvDataLoader:
-    """Parse CSV uploads from Dash."""
+    """Parse CSV uploads from Dash.
 
-    @staticmethod
-    def parse_contents(contents: str, filename: str | None) -> CsvPayload:
+    ``engine="pyarrow"`` parses with the multithreaded Arrow CSV reader and keeps
+    the columns Arrow-backed (``ArrowDtype``), which is considerably faster and
+    more compact for wide, string-heavy files. It needs the optional ``pyarrow``
+    package.
+
+    With ``chunk_rows`` set, uploads are decoded incrementally and parsed in
+    chunks of that many rows, so the decoded file never exists in memory in
+    full. The parsed chunks and the frame built from them do coexist while
+    they are concatenated, so peak memory is the encoded payload plus about
+    twice the frame, and ``compact=True`` briefly adds copies of the columns
+    it converts. Columns whose chunks infer different types are parsed again
+    as text and typed from all of their values, so they match a whole-file
+    parse; with Arrow that re-reads the whole file.
+
+    ``compact=True`` runs :func:`compact_dtypes` on every parsed frame.
+    """
+
+    def __init__(
+        self,
+        engine: str = "pandas",
+        chunk_rows: int | None = None,
+        compact: bool = False,
+    ) -> None:
+        if engine not in CSV_ENGINES:
+            raise ValueError(f"Unknown CSV engine {engine!r}; expected one of {CSV_ENGINES}.")
+        if engine == "pyarrow":
+            try:
+                import pyarrow.csv  # noqa: F401
+            except ImportError as exc:
+                raise ImportError("The 'pyarrow' CSV engine requires the pyarrow package.") from exc
+        self.engine = engine
+        self.chunk_rows = chunk_rows or None
+        self.compact = compact
+
+    def parse_contents(
+        self,
+        contents: str,
+        filename: str | None,
+        on_progress: ProgressCallback | None = None,
+    ) -> CsvPayload:
         if not contents:
             return CsvPayload(dataframe=None, error="No file contents provided.")
 
+        if self.chunk_rows:
+            payload = self._parse_streaming(contents, filename, on_progress)
+        else:
+            payload = self._parse_whole(contents, filename)
+
+        if self.compact and payload.dataframe is not None:
+            before = int(payload.dataframe.memory_usage(index=True, deep=True).sum())
+            try:
+                dataframe = compact_dtypes(payload.dataframe)
+            except Exception as exc:  # noqa: BLE001 - surface file errors to the user
+                return CsvPayload(
+                    dataframe=None, error=f"Unable to compact {filename or 'CSV'}: {exc}"
+                )
+            after = int(dataframe.memory_usage(index=True, deep=True).sum())
+            payload = CsvPayload(
+                dataframe=dataframe,
+                chunks=payload.chunks,
+                bytes_saved=max(0, before - after),
+            )
+        return payload
+
+    def _parse_whole(self, contents: str, filename: str | None) -> CsvPayload:
         try:
             _, content_string = contents.split(",", 1)
         except ValueError:
@@ -28,8 +274,125 @@ class CsvDataLoader:
 
         decoded = base64.b64decode(content_string)
         try:
-            dataframe = pd.read_csv(io.BytesIO(decoded))
+            if self.engine == "pyarrow":
+                dataframe = self._read_arrow(io.BytesIO(decoded))
+            else:
+                dataframe = pd.read_csv(io.BytesIO(decoded))
         except Exception as exc:  # noqa: BLE001 - surface file errors to the user
             return CsvPayload(dataframe=None, error=f"Unable to read {filename or 'CSV'}: {exc}")
 
         return CsvPayload(dataframe=dataframe)
+
+    def _parse_streaming(
+        self,
+        contents: str,
+        filename: str | None,
+        on_progress: ProgressCallback | None,
+    ) -> CsvPayload:
+        separator = contents.find(",")
+        if separator < 0:
+            return CsvPayload(dataframe=None, error="Invalid upload payload.")
+
+        try:
+            if self.engine == "pyarrow":
+                dataframe, chunks = self._stream_arrow(contents, separator + 1, on_progress)
+            else:
+                dataframe, chunks = self._stream_pandas(contents, separator + 1, on_progress)
+        except Exception as exc:  # noqa: BLE001 - surface file errors to the user
+            return CsvPayload(dataframe=None, error=f"Unable to read {filename or 'CSV'}: {exc}")
+
+        return CsvPayload(dataframe=dataframe, chunks=chunks)
+
+    def _stream_pandas(
+        self, contents: str, start: int, on_progress: ProgressCallback | None
+    ) -> tuple[pd.DataFrame, int]:
+        chunks = self._read_chunks(contents, start, on_progress)
+        dataframe = pd.concat(chunks, ignore_index=True)
+        # Each chunk infers its own dtypes, so a column whose chunks disagree
+        # (leading-zero IDs read as int in one chunk and text in another) is
+        # read again as text and typed from all of its values at once.
+        mixed = [
+            name
+            for name in dataframe.columns
+            if len({str(chunk[name].dtype) for chunk in chunks}) > 1
+        ]
+        if mixed:
+            text = pd.concat(
+                self._read_chunks(contents, start, None, usecols=mixed, dtype=str),
+                ignore_index=True,
+            )
+            for name in mixed:
+                dataframe[name] = _type_text_column(text[name])
+        return dataframe, len(chunks)
+
+    def _stream_arrow(
+        self, contents: str, start: int, on_progress: ProgressCallback | None
+    ) -> tuple[pd.DataFrame, int]:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        try:
+            chunks = self._read_chunks(contents, start, on_progress)
+            table = pa.Table.from_batches(chunks)
+        except pa.ArrowInvalid:
+            # Arrow fixes column types from the first block and rejects later
+            # values that do not fit, so read everything as text and type each
+            # column from all of its values.
+            chunks = self._read_chunks(contents, start, on_progress, as_text=True)
+            table = pa.Table.from_batches(chunks)
+            null_values = pa_csv.ConvertOptions().null_values
+            table = pa.table(
+                [_type_arrow_column(column, null_values) for column in table.columns],
+                names=table.column_names,
+            )
+        return table.to_pandas(types_mapper=pd.ArrowDtype), len(chunks)
+
+    def _read_chunks(
+        self,
+        contents: str,
+        start: int,
+        on_progress: ProgressCallback | None,
+        as_text: bool = False,
+        **read_csv_options,
+    ) -> list:
+        reader = Base64Reader(contents, start=start)
+        stream = io.BufferedReader(reader, buffer_size=1024 * 1024)
+        if self.engine == "pyarrow":
+            batches = self._iter_arrow_batches(stream, as_text)
+        else:
+            batches = pd.read_csv(stream, chunksize=self.chunk_rows, **read_csv_options)
+        chunks = []
+        rows = 0
+        for chunk in batches:
+            chunks.append(chunk)
+            rows += len(chunk)
+            if on_progress is not None:
+                on_progress(reader.progress, rows)
+        if not chunks:
+            raise ValueError("No columns to parse from file")
+        return chunks
+
+    def _iter_arrow_batches(self, stream: io.BufferedReader, as_text: bool = False):
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        # Arrow sizes batches in bytes; ~128 bytes per row keeps them near chunk_rows.
+        read_options = pa_csv.ReadOptions(
+            use_threads=True, block_size=max(1 << 20, self.chunk_rows * 128)
+        )
+        convert_options = pa_csv.ConvertOptions()
+        if as_text:
+            # Column types are set by name, so parse the buffered header line first.
+            header = stream.peek(read_options.block_size).split(b"\n", 1)[0] + b"\n"
+            names = pa_csv.read_csv(io.BytesIO(header)).column_names
+            convert_options.column_types = {name: pa.string() for name in names}
+        yield from pa_csv.open_csv(
+            stream, read_options=read_options, convert_options=convert_options
+        )
+
+    @staticmethod
+    def _read_arrow(buffer: io.BytesIO) -> pd.DataFrame:
+        from pyarrow import csv as pa_csv
+
+        table = pa_csv.read_csv(buffer, read_options=pa_csv.ReadOptions(use_threads=True))
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from caching import guard_across_fork
+
+
+@dataclass
+class _RegistryEntry:
+    dataframe: pd.DataFrame | None
+    nbytes: int
+    references: int = 0
+    spill_path: str | None = None
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class DatasetRegistry:
+    """Hold parsed dataframes in process memory, addressed by content hash.
+
+    Only the handle returned by ``register`` travels through the browser-side
+    stores, so callback payloads stay the same size regardless of the data.
+    Resident frames are kept in least-recently-used order; once their total
+    size exceeds ``memory_budget_bytes`` the oldest ones are spilled to disk
+    and decoded again on their next ``get``.
+
+    Handles live in browser memory, so a closed or reloaded page never
+    releases them. Entries not used for ``idle_expire_seconds`` are therefore
+    dropped, spill file included, whatever their reference count.
+    ``on_evict`` listeners are called with a handle whenever its frame leaves
+    memory (spilled, released or expired), so caches derived from it can be
+    dropped with it.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int | None = None,
+        idle_expire_seconds: float | None = None,
+    ) -> None:
+        self.memory_budget_bytes = memory_budget_bytes or None
+        self.idle_expire_seconds = idle_expire_seconds or None
+        self.on_evict: list[Callable[[str], None]] = []
+        self._entries: OrderedDict[str, _RegistryEntry] = OrderedDict()
+        self._resident_bytes = 0
+        self._spill_dir: str | None = None
+        self._lock = threading.Lock()
+        guard_across_fork(self)
+
+    @staticmethod
+    def content_hash(dataframe: pd.DataFrame) -> str:
+        digest = hashlib.sha1()
+        digest.update("\x1f".join(map(str, dataframe.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(dataframe, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    def register(self, dataframe: pd.DataFrame) -> str:
+        handle = self.content_hash(dataframe)
+        evicted = []
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                entry = _RegistryEntry(
+                    dataframe=dataframe,
+                    nbytes=int(dataframe.memory_usage(index=True, deep=True).sum()),
+                )
+                self._entries[handle] = entry
+                self._resident_bytes += entry.nbytes
+            elif entry.dataframe is None:
+                entry.dataframe = dataframe
+                self._resident_bytes += entry.nbytes
+            entry.references += 1
+            self._touch(handle, entry, evicted)
+        self._notify(evicted)
+        return handle
+
+    def __contains__(self, handle: object) -> bool:
+        """Whether ``handle`` is still registered; does not load a spilled frame."""
+        evicted = []
+        with self._lock:
+            self._expire_idle(evicted)
+            registered = handle in self._entries
+        self._notify(evicted)
+        return registered
+
+    def get(self, handle: str | None) -> pd.DataFrame | None:
+        if not handle:
+            return None
+        evicted = []
+        with self._lock:
+            # Expire first, so an idle handle is not revived by asking for it.
+            self._expire_idle(evicted)
+            entry = self._entries.get(handle)
+            if entry is not None:
+                self._touch(handle, entry, evicted)
+                dataframe = entry.dataframe
+        self._notify(evicted)
+        return None if entry is None else dataframe
+
+    def release(self, handle: str | None) -> bool:
+        """Drop one reference to ``handle``; return True if the data was freed."""
+        if not handle:
+            return False
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return False
+            entry.references -= 1
+            if entry.references > 0:
+                return False
+            self._drop(handle)
+        self._notify([handle])
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._resident_bytes = 0
+            if self._spill_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+    def _touch(self, handle: str, entry: _RegistryEntry, evicted: list[str]) -> None:
+        if entry.dataframe is None:
+            entry.dataframe = pd.read_pickle(entry.spill_path)
+            self._resident_bytes += entry.nbytes
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(handle)
+        self._expire_idle(evicted)
+        self._enforce_budget(evicted)
+
+    def _drop(self, handle: str) -> None:
+        entry = self._entries.pop(handle)
+        if entry.dataframe is not None:
+            self._resident_bytes -= entry.nbytes
+        if entry.spill_path and os.path.exists(entry.spill_path):
+            os.remove(entry.spill_path)
+
+    def _expire_idle(self, evicted: list[str]) -> None:
+        if self.idle_expire_seconds is None:
+            return
+        cutoff = time.monotonic() - self.idle_expire_seconds
+        # Entries are in least-recently-used order, so the idle ones come first.
+        for handle, entry in list(self._entries.items()):
+            if entry.last_used > cutoff:
+                return
+            self._drop(handle)
+            evicted.append(handle)
+
+    def _enforce_budget(self, evicted: list[str]) -> None:
+        if self.memory_budget_bytes is None:
+            return
+        # The most recently used entry always stays resident.
+        for handle in list(self._entries.keys())[:-1]:
+            if self._resident_bytes <= self.memory_budget_bytes:
+                return
+            entry = self._entries[handle]
+            if entry.dataframe is None:
+                continue
+            if entry.spill_path is None:
+                if self._spill_dir is None:
+                    self._spill_dir = tempfile.mkdtemp(prefix="csv-insight-")
+                entry.spill_path = os.path.join(self._spill_dir, f"{handle}.pkl")
+                entry.dataframe.to_pickle(entry.spill_path)
+            entry.dataframe = None
+            self._resident_bytes -= entry.nbytes
+            evicted.append(handle)
+
+    def _notify(self, handles: list[str]) -> None:
+        # Listeners run outside the registry lock; they may call back into it.
+        for handle in handles:
+            for listener in self.on_evict:
+                listener(handle)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLING_MODES = {
+    "LTTB": "lttb",
+    "Min / max per bucket": "minmax",
+    "Off": "none",
+}
+DEFAULT_POINT_BUDGET = 5000
+MIN_GROUP_POINTS = 3
+
+
+def _numeric_axis(series: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        converted = pd.to_datetime(series)
+        if converted.dt.tz is not None:
+            converted = converted.dt.tz_convert(None)
+        return converted.to_numpy(dtype="datetime64[ns]").view("int64").astype(float)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+    # Categorical or text x values: triangle areas use the row position instead.
+    return np.arange(len(series), dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: positions of ``n_out`` representative points.
+
+    Bucket edges and next-bucket centroids are computed in one vectorized pass;
+    the per-bucket argmax runs on array slices because each pick depends on the
+    point chosen in the previous bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    starts, stops = edges[:-1], edges[1:]
+    sizes = stops - starts
+    # Each bucket is steered by the centroid of the next one; the last by the end point.
+    centroid_x = np.append((np.add.reduceat(x[:-1], starts) / sizes)[1:], x[-1])
+    centroid_y = np.append((np.add.reduceat(y[:-1], starts) / sizes)[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket, (start, stop) in enumerate(zip(starts, stops)):
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs(
+            (x[anchor] - centroid_x[bucket]) * (by - y[anchor])
+            - (x[anchor] - bx) * (centroid_y[bucket] - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the minimum and maximum ``y`` per bucket, at most ``n_out`` of them.
+
+    Buckets are contiguous runs of equal length, so ``y`` is padded into a
+    ``(buckets, size)`` matrix and reduced row by row without sorting. The
+    first and last points are kept too when ``n_out`` leaves room for them.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+
+    ends = np.array([0, n - 1] if n_out >= 4 else [], dtype=np.int64)
+    size = -(-n // max(1, (n_out - len(ends)) // 2))
+    rows = -(-n // size)
+    offsets = np.arange(rows) * size
+    padded = np.full(rows * size, np.inf)
+    padded[:n] = y
+    lowest = offsets + np.argmin(padded.reshape(rows, size), axis=1)
+    padded[n:] = -np.inf
+    highest = offsets + np.argmax(padded.reshape(rows, size), axis=1)
+    return np.unique(np.concatenate([lowest, highest, ends]))
+
+
+def downsample(
+    chart_data: pd.DataFrame,
+    x_column: str,
+    y_column: str,
+    group_columns: list[str],
+    mode: str,
+    point_budget: int,
+) -> pd.DataFrame:
+    """Reduce ``chart_data`` to at most ``point_budget`` rows, per trace group.
+
+    Each color / dash / symbol group gets ``MIN_GROUP_POINTS`` plus a share of
+    the rest of the budget proportional to its size, and rows keep their
+    original order. When there are more groups than the budget has room for,
+    only the largest groups are drawn.
+    """
+    total = len(chart_data)
+    if mode == "none" or total <= point_budget:
+        return chart_data
+
+    select = lttb_indices if mode == "lttb" else minmax_indices
+    x_all = _numeric_axis(chart_data[x_column])
+    y_all = chart_data[y_column].to_numpy(dtype=float, na_value=np.nan)
+
+    if group_columns:
+        groups = chart_data.groupby(
+            group_columns, sort=False, dropna=False, observed=True
+        ).indices.values()
+    else:
+        groups = [np.arange(total)]
+    groups = [
+        positions[~(np.isnan(y_all[positions]) | np.isnan(x_all[positions]))]
+        for positions in groups
+    ]
+    slots = max(1, point_budget // MIN_GROUP_POINTS)
+    if len(groups) > slots:
+        groups = sorted(groups, key=len, reverse=True)[:slots]
+    floor = min(MIN_GROUP_POINTS, point_budget)
+    spare = point_budget - floor * len(groups)
+    points = sum(len(positions) for positions in groups)
+
+    kept = []
+    for positions in groups:
+        budget = floor + (spare * len(positions) // points if points else 0)
+        kept.append(positions[select(x_all[positions], y_all[positions], budget)])
+    rows = np.sort(np.concatenate(kept)) if kept else np.arange(0)
+    return chart_data.iloc[rows]
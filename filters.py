@@ -1,47 +1,392 @@
 from __future__ import annotations
 
+import threading
+from collections.abc import Callable, Hashable, Iterable
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
+from caching import LruCache, guard_across_fork
+from data_loader import looks_like_timestamps
+
+DatasetSource = Callable[[str], "pd.DataFrame | None"]
+
 
 @dataclass(frozen=True)
 class FilterConfig:
     title_column: str | None
-    title_values: list[str] | None
+    title_values: tuple[str, ...] | None
     time_column: str | None
     start_date: str | None
     end_date: str | None
 
+    def __post_init__(self) -> None:
+        # Keep the config hashable when values arrive as JSON lists.
+        if self.title_values is not None and not isinstance(self.title_values, tuple):
+            object.__setattr__(self, "title_values", tuple(self.title_values))
+
+
+@dataclass(frozen=True)
+class TimeIndex:
+    """Sorted view of a datetime column for binary-search range lookups.
+
+    ``values`` holds the non-missing timestamps in ascending order and ``order``
+    the row positions they came from, or ``None`` when the column is already
+    sorted without gaps so that positions and sorted ranks coincide.
+    """
+
+    values: np.ndarray
+    order: np.ndarray | None
+
+    @classmethod
+    def build(cls, converted: pd.Series) -> "TimeIndex | None":
+        if isinstance(converted.dtype, pd.DatetimeTZDtype):
+            return None
+        try:
+            values = converted.to_numpy(dtype="datetime64[ns]", na_value=np.datetime64("NaT"))
+        except (TypeError, ValueError):
+            return None
+        valid = ~np.isnat(values)
+        if valid.all() and bool((values[1:] >= values[:-1]).all()):
+            return cls(values=values, order=None)
+        positions = np.flatnonzero(valid)
+        order = positions[np.argsort(values[positions], kind="stable")]
+        return cls(values=values[order], order=order)
+
+    def range_positions(self, start: pd.Timestamp, end: pd.Timestamp) -> slice | np.ndarray:
+        """Row positions with ``start <= value <= end``, in original row order."""
+        low = np.searchsorted(self.values, np.datetime64(start.as_unit("ns").asm8), "left")
+        high = np.searchsorted(self.values, np.datetime64(end.as_unit("ns").asm8), "right")
+        if self.order is None:
+            return slice(low, max(low, high))
+        return np.sort(self.order[low:high])
+
+    def bounds(self) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+        if len(self.values) == 0:
+            return None, None
+        return pd.Timestamp(self.values[0]), pd.Timestamp(self.values[-1])
+
+
+@dataclass(frozen=True)
+class DictionaryColumn:
+    """A column factorized into integer codes and the string form of each code.
+
+    Missing values get code ``-1``, which maps to the always-false slot at the
+    end of the lookup table built by :meth:`mask`.
+    """
+
+    codes: np.ndarray
+    labels: np.ndarray
+
+    @classmethod
+    def build(cls, series: pd.Series) -> "DictionaryColumn":
+        codes, uniques = pd.factorize(series)
+        labels = np.asarray(pd.Index(uniques).astype(str), dtype=object)
+        return cls(codes=codes, labels=labels)
+
+    def mask(self, values: Iterable[str], rows: np.ndarray | None = None) -> np.ndarray:
+        lookup = np.zeros(len(self.labels) + 1, dtype=bool)
+        lookup[:-1] = np.isin(self.labels, list(values))
+        codes = self.codes if rows is None else self.codes[rows]
+        return lookup[codes]
+
 
 class DataFilter:
-    """Apply user-specified filters to a dataframe."""
+    """Apply user-specified filters to a dataframe.
 
-    @staticmethod
-    def apply(data: pd.DataFrame, config: FilterConfig) -> pd.DataFrame:
-        filtered = data.copy()
+    When a ``dataset_key`` is passed and a ``dataset_source`` is configured,
+    typed versions of the dataset's columns are computed once per
+    (dataset, column) from the full registered frame and reused by every call.
+    Time-range filters on the full dataset then resolve through a cached
+    :class:`TimeIndex` instead of scanning the column, and title filters
+    compare integer codes of a cached :class:`DictionaryColumn`.
 
-        if config.title_column and config.title_values:
-            filtered = filtered[
-                filtered[config.title_column].astype(str).isin(config.title_values)
-            ]
+    Filters work on row positions of the full dataset: ``select`` narrows an
+    optional earlier selection and ``take`` builds a frame only when a caller
+    needs one. Selected positions are kept in an LRU cache keyed by dataset,
+    ``FilterConfig`` and the key of the narrowed selection, bounded by entry
+    count and by the bytes of the position arrays.
+    """
+
+    def __init__(
+        self,
+        dataset_source: DatasetSource | None = None,
+        result_cache_entries: int = 64,
+        result_cache_bytes: int | None = None,
+    ) -> None:
+        self._dataset_source = dataset_source
+        self.results: LruCache[np.ndarray | None] = LruCache(
+            result_cache_entries, result_cache_bytes
+        )
+        self._datetime_columns: dict[tuple[str, str], pd.Series] = {}
+        self._time_indexes: dict[tuple[str, str], TimeIndex | None] = {}
+        self._dictionary_columns: dict[tuple[str, str], DictionaryColumn] = {}
+        self._discards: dict[str, int] = {}
+        self._lock = threading.Lock()
+        guard_across_fork(self)
+
+    def apply(
+        self,
+        data: pd.DataFrame,
+        config: FilterConfig,
+        dataset_key: str | None = None,
+        rows: np.ndarray | None = None,
+    ) -> pd.DataFrame:
+        positions = self.select(data, config, dataset_key, rows)
+        return self.take(data, positions, dataset_key, [config.time_column])
+
+    def select(
+        self,
+        data: pd.DataFrame,
+        config: FilterConfig,
+        dataset_key: str | None = None,
+        rows: np.ndarray | None = None,
+        rows_key: Hashable | None = None,
+    ) -> np.ndarray | None:
+        """Return the sorted row positions of ``data`` that pass ``config``.
+
+        ``rows`` restricts the candidates to an earlier selection, and ``None``
+        (as input or result) stands for every row, so no row array or frame copy
+        is made when no filter is active. Results are cached for registered
+        datasets when ``rows`` is ``None`` or identified by ``rows_key``.
+        """
+        if self._source(dataset_key) is None or (rows is not None and rows_key is None):
+            return self._select(data, config, dataset_key, rows)
 
+        def compute() -> np.ndarray | None:
+            positions = self._select(data, config, dataset_key, rows)
+            if positions is not None:
+                positions.flags.writeable = False
+            return positions
+
+        return self.results.get_or_compute((dataset_key, rows_key, config), compute)
+
+    def _select(
+        self,
+        data: pd.DataFrame,
+        config: FilterConfig,
+        dataset_key: str | None,
+        rows: np.ndarray | None,
+    ) -> np.ndarray | None:
+        positions = rows
+
+        # The time filter goes first: with a cached index it is a binary search.
         if config.time_column and config.start_date and config.end_date:
-            converted = pd.to_datetime(filtered[config.time_column], errors="coerce")
-            filtered = filtered.assign(**{config.time_column: converted})
-            start = pd.to_datetime(config.start_date)
-            end = pd.to_datetime(config.end_date)
-            filtered = filtered[filtered[config.time_column].between(start, end)]
+            positions = self._select_time(
+                data,
+                config.time_column,
+                pd.to_datetime(config.start_date),
+                pd.to_datetime(config.end_date),
+                dataset_key,
+                positions,
+            )
+
+        if config.title_column and config.title_values:
+            mask = self._title_mask(
+                data, config.title_column, config.title_values, dataset_key, positions
+            )
+            positions = np.flatnonzero(mask) if positions is None else positions[mask]
+
+        return positions
+
+    def select_range(
+        self,
+        data: pd.DataFrame,
+        column: str,
+        low: object,
+        high: object,
+        dataset_key: str | None = None,
+        rows: np.ndarray | None = None,
+        rows_key: Hashable | None = None,
+    ) -> np.ndarray | None:
+        """Narrow ``rows`` to ``low <= data[column] <= high``.
+
+        Date bounds (or datetime columns) go through the cached time index; other
+        numeric bounds are compared against the column directly.
+        """
+        if isinstance(low, str) or pd.api.types.is_datetime64_any_dtype(data[column]):
+            config = FilterConfig(None, None, column, str(low), str(high))
+            return self.select(data, config, dataset_key, rows, rows_key)
+
+        series = data[column] if rows is None else data[column].iloc[rows]
+        mask = series.between(low, high).to_numpy()
+        return np.flatnonzero(mask) if rows is None else rows[mask]
+
+    def take(
+        self,
+        data: pd.DataFrame,
+        rows: np.ndarray | None,
+        dataset_key: str | None = None,
+        time_columns: Iterable[str | None] = (),
+        columns: Iterable[str] | None = None,
+    ) -> pd.DataFrame:
+        """Materialize ``rows`` of ``data`` with ``time_columns`` shown as datetimes.
+
+        ``columns`` limits the frame to the columns a caller reads, so only
+        those are gathered. ``data`` itself is returned when every row and
+        column is kept and no column needs converting; a frame is only built
+        for columns that actually change.
+        """
+        frame = data if columns is None else data[list(dict.fromkeys(columns))]
+        subset = frame if rows is None else frame.iloc[rows]
+        converted = {}
+        for column in dict.fromkeys(time_columns):
+            if (
+                not column
+                or column not in frame.columns
+                or pd.api.types.is_datetime64_any_dtype(data[column])
+            ):
+                continue
+            values = self.datetime_column(data, column, dataset_key)
+            converted[column] = values if rows is None else values.iloc[rows]
+        return subset.assign(**converted) if converted else subset
+
+    def _title_mask(
+        self,
+        data: pd.DataFrame,
+        column: str,
+        values: Iterable[str],
+        dataset_key: str | None,
+        rows: np.ndarray | None,
+    ) -> np.ndarray:
+        source = self._source(dataset_key)
+        encoded = self.dictionary_column(column, dataset_key)
+        if encoded is not None and data.index.equals(source.index):
+            return encoded.mask(values, rows)
+
+        series = data[column] if rows is None else data[column].iloc[rows]
+        return series.astype(str).isin(values).to_numpy()
 
-        return filtered
+    def _select_time(
+        self,
+        data: pd.DataFrame,
+        column: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        dataset_key: str | None,
+        rows: np.ndarray | None,
+    ) -> np.ndarray:
+        source = self._source(dataset_key)
+        time_index = self.time_index(column, dataset_key)
+        if time_index is not None and data.index.equals(source.index):
+            in_range = time_index.range_positions(start, end)
+            if isinstance(in_range, slice):
+                if rows is None:
+                    return np.arange(in_range.start, in_range.stop)
+                low, high = np.searchsorted(rows, [in_range.start, in_range.stop])
+                return rows[low:high]
+            if rows is None:
+                return in_range
+            return np.intersect1d(rows, in_range, assume_unique=True)
+
+        converted = self.datetime_column(data, column, dataset_key)
+        if rows is not None:
+            converted = converted.iloc[rows]
+        mask = converted.between(start, end).to_numpy()
+        return np.flatnonzero(mask) if rows is None else rows[mask]
+
+    def time_index(self, column: str, dataset_key: str | None) -> TimeIndex | None:
+        """Sorted index of a dataset's datetime column, built once and cached."""
+        source = self._source(dataset_key)
+        if source is None or column not in source.columns:
+            return None
+        return self._cached(
+            self._time_indexes,
+            (dataset_key, column),
+            lambda: TimeIndex.build(self.datetime_column(source, column, dataset_key)),
+        )
+
+    def dictionary_column(self, column: str, dataset_key: str | None) -> DictionaryColumn | None:
+        """Factorized form of a dataset column, built once and cached."""
+        source = self._source(dataset_key)
+        if source is None or column not in source.columns:
+            return None
+        return self._cached(
+            self._dictionary_columns,
+            (dataset_key, column),
+            lambda: DictionaryColumn.build(source[column]),
+        )
+
+    def datetime_column(
+        self, data: pd.DataFrame, column: str, dataset_key: str | None = None
+    ) -> pd.Series:
+        """Return ``data[column]`` converted to datetimes, aligned to ``data``'s rows."""
+        source = self._source(dataset_key)
+        if source is None or column not in source.columns:
+            return pd.to_datetime(data[column], errors="coerce")
+
+        converted = self._cached(
+            self._datetime_columns,
+            (dataset_key, column),
+            lambda: pd.to_datetime(source[column], errors="coerce"),
+        )
+        if data.index.equals(converted.index):
+            return converted
+        return converted.loc[data.index]
+
+    def _cached(self, cache: dict, key: tuple[str, str], build: Callable[[], object]):
+        with self._lock:
+            if key in cache:
+                return cache[key]
+            discards = self._discards.get(key[0], 0)
+        value = build()
+        with self._lock:
+            # A dataset discarded while this was built keeps nothing derived from it.
+            if self._discards.get(key[0], 0) == discards:
+                cache[key] = value
+        return value
+
+    def parses_as_datetime(
+        self, data: pd.DataFrame, column: str, dataset_key: str | None = None
+    ) -> bool:
+        """Whether ``column`` holds datetimes, or text that converts to them entirely.
+
+        Uses the loader's timestamp rule: a short sample must parse as
+        timestamps before the whole column is converted.
+        """
+        series = data[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return True
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            return False
+        if not looks_like_timestamps(series):
+            return False
+        converted = self.datetime_column(data, column, dataset_key)
+        return converted.notna().sum() == series.notna().sum()
+
+    def discard(self, dataset_key: str) -> None:
+        """Forget every typed column and cached result computed for ``dataset_key``."""
+        with self._lock:
+            self._discards[dataset_key] = self._discards.get(dataset_key, 0) + 1
+            for cache in (
+                self._datetime_columns,
+                self._time_indexes,
+                self._dictionary_columns,
+            ):
+                for key in [key for key in cache if key[0] == dataset_key]:
+                    del cache[key]
+        self.results.discard_where(lambda key: key[0] == dataset_key)
+
+    def _source(self, dataset_key: str | None) -> pd.DataFrame | None:
+        if dataset_key is None or self._dataset_source is None:
+            return None
+        return self._dataset_source(dataset_key)
 
     @staticmethod
     def unique_values(series: pd.Series) -> list[str]:
-        return sorted({str(value) for value in series.dropna().unique()})
+        # Same formatting as the title filters compare against.
+        return sorted(pd.Index(series.dropna().unique()).astype(str).unique())
 
-    @staticmethod
-    def datetime_bounds(series: pd.Series) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
-        converted = pd.to_datetime(series, errors="coerce")
+    def datetime_bounds(
+        self, data: pd.DataFrame, column: str, dataset_key: str | None = None
+    ) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+        source = self._source(dataset_key)
+        time_index = self.time_index(column, dataset_key)
+        if time_index is not None and data.index.equals(source.index):
+            return time_index.bounds()
+
+        converted = self.datetime_column(data, column, dataset_key)
         min_time = converted.min()
         max_time = converted.max()
         if pd.isna(min_time) or pd.isna(max_time):
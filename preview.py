@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from caching import LruCache
+from filters import DataFilter
+
+DEFAULT_PAGE_SIZE = 10
+RELATIONAL_OPERATORS = {
+    "=": "=",
+    "eq": "=",
+    "!=": "!=",
+    "ne": "!=",
+    "<": "<",
+    "lt": "<",
+    "<=": "<=",
+    "le": "<=",
+    ">": ">",
+    "gt": ">",
+    ">=": ">=",
+    "ge": ">=",
+}
+BLANK_OPERATORS = ("is blank", "is not blank")
+
+# Date prefixes that end on a whole field, so they name a complete period.
+_FULL_PERIOD = re.compile(r"^\d{4}(-\d{2}(-\d{2}([ T]\d{2}(:\d{2}(:\d{2})?)?)?)?)?$")
+_CLAUSE = re.compile(
+    r"^\{(?P<column>[^}]*)\}\s*"
+    r"(?:(?P<blank>is blank|is not blank)"
+    r"|(?P<case>[is]?)(?P<operator>contains|datestartswith|eq|ne|lt|le|gt|ge|[!<>]=|[<>=])"
+    r"\s*(?P<value>.*))$"
+)
+
+
+@dataclass(frozen=True)
+class FilterClause:
+    column: str
+    operator: str
+    value: str | None = None
+    case_sensitive: bool = True
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+        return value[1:-1].replace("\\" + value[0], value[0])
+    return value
+
+
+def parse_filter_query(query: str | None) -> tuple[FilterClause, ...]:
+    """Split a DataTable ``filter_query`` into clauses that must all hold.
+
+    Supports the queries the table's column filters produce: relational
+    operators in symbol or word form, ``contains`` and ``datestartswith`` with
+    an optional ``i``/``s`` case prefix, and ``is blank``/``is not blank``,
+    joined by ``&&``. Raises ``ValueError`` for anything else.
+    """
+    clauses = []
+    for part in re.split(r"\s+&&\s+", (query or "").strip()):
+        part = part.strip()
+        if part.startswith("(") and part.endswith(")"):
+            part = part[1:-1].strip()
+        if not part:
+            continue
+        match = _CLAUSE.match(part)
+        if match is None or (match["operator"] and not match["value"].strip()):
+            raise ValueError(f"Unsupported filter expression {part!r}.")
+        if match["blank"]:
+            clauses.append(FilterClause(match["column"], match["blank"]))
+            continue
+        operator = RELATIONAL_OPERATORS.get(match["operator"], match["operator"])
+        clauses.append(
+            FilterClause(
+                match["column"],
+                operator,
+                _unquote(match["value"]),
+                case_sensitive=match["case"] != "i",
+            )
+        )
+    return tuple(clauses)
+
+
+def _compare(values: np.ndarray | pd.Series, operator: str, bound: object) -> np.ndarray:
+    if operator == "=":
+        result = values == bound
+    elif operator == "!=":
+        result = values != bound
+    elif operator == "<":
+        result = values < bound
+    elif operator == "<=":
+        result = values <= bound
+    elif operator == ">":
+        result = values > bound
+    else:
+        result = values >= bound
+    return np.asarray(result, dtype=bool)
+
+
+def _as_text_if_mixed(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_object_dtype(values):
+        return values.map(str, na_action="ignore")
+    return values
+
+
+class PreviewTable:
+    """Pages of a dataset selection for a DataTable with custom paging, sorting and filtering.
+
+    The row positions matching a table filter, in the table's sort order, are
+    cached per dataset, selection, filter query and sort, so turning a page
+    only materializes the rows on that page.
+    """
+
+    def __init__(self, data_filter: DataFilter, cache_entries: int = 16) -> None:
+        self.data_filter = data_filter
+        self.orders: LruCache[np.ndarray | None] = LruCache(cache_entries)
+
+    def page(
+        self,
+        data: pd.DataFrame,
+        rows: np.ndarray | None,
+        dataset_key: str | None,
+        rows_key: Hashable,
+        filter_query: str | None = None,
+        sort_by: list[dict] | None = None,
+        page_current: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        time_columns: Iterable[str | None] = (),
+    ) -> tuple[pd.DataFrame, int]:
+        """Rows on page ``page_current`` of the filtered, sorted selection, and the page count.
+
+        ``rows`` is the selection to browse (``None`` for every row) and
+        ``rows_key`` identifies it in the cache. Raises ``ValueError`` for a
+        filter query :func:`parse_filter_query` cannot read.
+        """
+        clauses = parse_filter_query(filter_query)
+        sort_key = tuple(
+            (sort["column_id"], sort["direction"])
+            for sort in sort_by or ()
+            if sort.get("column_id") in data.columns
+        )
+
+        def compute() -> np.ndarray | None:
+            positions = rows
+            for clause in clauses:
+                if clause.column not in data.columns:
+                    raise ValueError(f"Unknown column {clause.column!r} in filter.")
+                mask = self._clause_mask(data, clause, dataset_key, positions)
+                positions = np.flatnonzero(mask) if positions is None else positions[mask]
+            if sort_key:
+                positions = self._sorted(data, positions, sort_key)
+            if positions is not None:
+                positions.flags.writeable = False
+            return positions
+
+        positions = self.orders.get_or_compute(
+            (dataset_key, rows_key, clauses, sort_key), compute
+        )
+        total = len(data) if positions is None else len(positions)
+        start = max(page_current, 0) * page_size
+        stop = min(start + page_size, total)
+        page_rows = (
+            np.arange(start, max(start, stop)) if positions is None else positions[start:stop]
+        )
+        page_count = max(1, math.ceil(total / page_size))
+        return self.data_filter.take(data, page_rows, dataset_key, time_columns), page_count
+
+    def _clause_mask(
+        self,
+        data: pd.DataFrame,
+        clause: FilterClause,
+        dataset_key: str | None,
+        rows: np.ndarray | None,
+    ) -> np.ndarray:
+        series = data[clause.column] if rows is None else data[clause.column].iloc[rows]
+        if clause.operator in BLANK_OPERATORS:
+            blank = series.isna().to_numpy()
+            if not pd.api.types.is_numeric_dtype(series):
+                blank |= self._text_mask(
+                    data,
+                    clause.column,
+                    lambda labels: (labels.str.strip() == "").to_numpy(dtype=bool),
+                    dataset_key,
+                    rows,
+                )
+            return blank if clause.operator == "is blank" else ~blank
+
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        if clause.operator in RELATIONAL_OPERATORS.values() and numeric:
+            try:
+                bound = float(clause.value)
+            except ValueError as exc:
+                raise ValueError(
+                    f"{clause.column!r} needs a number, not {clause.value!r}."
+                ) from exc
+            return _compare(series.to_numpy(dtype=float, na_value=np.nan), clause.operator, bound)
+
+        if not numeric and self.data_filter.parses_as_datetime(data, clause.column, dataset_key):
+            return self._datetime_mask(data, clause, dataset_key, rows)
+
+        value = clause.value if clause.case_sensitive else clause.value.lower()
+
+        def _match(labels: pd.Series) -> np.ndarray:
+            if not clause.case_sensitive:
+                labels = labels.str.lower()
+            if clause.operator == "contains":
+                return labels.str.contains(value, regex=False).to_numpy(dtype=bool)
+            if clause.operator == "datestartswith":
+                return labels.str.startswith(value).to_numpy(dtype=bool)
+            return _compare(labels, clause.operator, value)
+
+        return self._text_mask(data, clause.column, _match, dataset_key, rows)
+
+    def _text_mask(
+        self,
+        data: pd.DataFrame,
+        column: str,
+        predicate: Callable[[pd.Series], np.ndarray],
+        dataset_key: str | None,
+        rows: np.ndarray | None,
+    ) -> np.ndarray:
+        """Evaluate ``predicate`` on the string form of ``column``.
+
+        Text columns of registered datasets are matched once per distinct
+        value through the cached dictionary encoding.
+        """
+        series = data[column]
+        if not pd.api.types.is_numeric_dtype(series):
+            encoded = self.data_filter.dictionary_column(column, dataset_key)
+            if encoded is not None and len(encoded.codes) == len(data):
+                lookup = np.zeros(len(encoded.labels) + 1, dtype=bool)
+                lookup[:-1] = predicate(pd.Series(encoded.labels, dtype=object))
+                return lookup[encoded.codes if rows is None else encoded.codes[rows]]
+        subset = series if rows is None else series.iloc[rows]
+        return np.asarray(predicate(subset.astype(str)), dtype=bool) & subset.notna().to_numpy()
+
+    def _datetime_mask(
+        self,
+        data: pd.DataFrame,
+        clause: FilterClause,
+        dataset_key: str | None,
+        rows: np.ndarray | None,
+    ) -> np.ndarray:
+        converted = self.data_filter.datetime_column(data, clause.column, dataset_key)
+        if rows is not None:
+            converted = converted.iloc[rows]
+        value = clause.value.replace("T", " ")
+        if clause.operator == "contains" or (
+            clause.operator == "datestartswith" and not _FULL_PERIOD.match(value)
+        ):
+            # Partial prefixes such as "2024-01-2" match as text, like the table does.
+            text = converted.dt.strftime("%Y-%m-%d %H:%M:%S")
+            if clause.operator == "contains":
+                return text.str.contains(value, regex=False).to_numpy(dtype=bool)
+            return text.str.startswith(value).to_numpy(dtype=bool)
+        try:
+            if clause.operator == "datestartswith":
+                # A date prefix such as "2024-03" covers a whole period.
+                period = pd.Period(clause.value)
+                low, high = period.start_time, period.end_time
+            else:
+                low = high = pd.Timestamp(clause.value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"{clause.column!r} needs a date, not {clause.value!r}.") from exc
+        tz = getattr(converted.dt, "tz", None)
+        if tz is not None:
+            low, high = low.tz_localize(tz), high.tz_localize(tz)
+        if clause.operator == "datestartswith":
+            return converted.between(low, high).to_numpy(dtype=bool)
+        return _compare(converted, clause.operator, low)
+
+    @staticmethod
+    def _sorted(
+        data: pd.DataFrame,
+        positions: np.ndarray | None,
+        sort_key: tuple[tuple[str, str], ...],
+    ) -> np.ndarray:
+        columns = [column for column, _ in sort_key]
+        frame = data[columns] if positions is None else data[columns].iloc[positions]
+        frame = frame.reset_index(drop=True)
+        options = dict(
+            ascending=[direction == "asc" for _, direction in sort_key],
+            kind="stable",
+            na_position="last",
+        )
+        try:
+            order = frame.sort_values(columns, **options).index.to_numpy()
+        except TypeError:
+            # Object columns mixing types, such as ints and strings, sort as text.
+            order = frame.sort_values(columns, key=_as_text_if_mixed, **options).index.to_numpy()
+        return order if positions is None else positions[order]
+
+    def discard(self, dataset_key: str) -> None:
+        self.orders.discard_where(lambda key: key[0] == dataset_key)
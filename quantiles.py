@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+QUANTILES = {"median": 0.5, "p95": 0.95, "p99": 0.99}
+QUANTILE_MODES = ("exact", "sketch")
+SKETCH_SIZE = 500
+SKETCH_CHUNK_ROWS = 1_000_000
+
+
+def _sorted_by_group(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Positions ordering rows by group, then value.
+
+    Both variants beat ``np.lexsort``: a value sort followed by a stable sort
+    of the group codes, which numpy runs as a radix sort while they fit in 16
+    bits, or else one sort of a combined ``group * n + value rank`` key.
+    """
+    order = np.argsort(values)
+    if not len(order):
+        return order
+    if groups.max() < 2**16:
+        return order[np.argsort(groups[order].astype(np.uint16), kind="stable")]
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return np.argsort(groups.astype(np.int64) * len(order) + ranks)
+
+
+def exact_quantiles(
+    groups: np.ndarray, values: np.ndarray, group_count: int, q: float
+) -> np.ndarray:
+    """Per-group quantile with linear interpolation, like ``groupby().quantile``.
+
+    ``groups`` holds a code in ``range(group_count)`` for every value; NaN
+    values are ignored and groups without values give NaN.
+    """
+    keep = ~np.isnan(values)
+    groups, values = groups[keep], values[keep]
+    order = _sorted_by_group(groups, values)
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.cumsum(counts) - counts
+    result = np.full(group_count, np.nan)
+    present = counts > 0
+    position = starts[present] + (counts[present] - 1) * q
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    result[present] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return result
+
+
+@dataclass(frozen=True)
+class QuantileSketch:
+    """Mergeable per-group quantile summary.
+
+    Each group keeps at most ``size`` of its values at evenly spaced ranks,
+    each weighted by the number of values it stands for. A summary of ``n``
+    values misplaces any rank by at most ``n / size``. Merging concatenates
+    the points and compacts each group back to ``size`` points, adding at
+    most another ``n / size``. ``quantile`` returns a stored value rather than
+    interpolating between neighbours, which costs up to one more position.
+    For a group of ``n`` values the answer is therefore within
+    ``2 / size + 1 / n`` of the true normalized rank, whatever the number of
+    chunks: 0.4% for large groups at the default size, but up to ``1 / n``
+    for small ones (0.05 for a group of 20).
+
+    Building a summary sorts its input, so sketches cost at least as much as
+    :func:`exact_quantiles`. They are useful for their bounded size and for
+    merging, not for speed.
+    """
+
+    groups: np.ndarray
+    values: np.ndarray
+    weights: np.ndarray
+    group_count: int
+    size: int = SKETCH_SIZE
+
+    @classmethod
+    def build(
+        cls,
+        groups: np.ndarray,
+        values: np.ndarray,
+        group_count: int,
+        size: int = SKETCH_SIZE,
+    ) -> QuantileSketch:
+        keep = ~np.isnan(values)
+        return cls._summarize(
+            groups[keep], values[keep], np.ones(int(keep.sum())), group_count, size
+        )
+
+    @classmethod
+    def merge_all(cls, sketches: Iterable[QuantileSketch]) -> QuantileSketch:
+        sketches = list(sketches)
+        first = sketches[0]
+        return cls._summarize(
+            np.concatenate([sketch.groups for sketch in sketches]),
+            np.concatenate([sketch.values for sketch in sketches]),
+            np.concatenate([sketch.weights for sketch in sketches]),
+            first.group_count,
+            first.size,
+        )
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        return self.merge_all([self, other])
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Value at normalized rank ``q`` for every group (NaN for empty groups)."""
+        totals = np.bincount(self.groups, weights=self.weights, minlength=self.group_count)
+        before = np.cumsum(totals) - totals
+        cumulative = np.cumsum(self.weights)
+        present = totals > 0
+        points = np.bincount(self.groups, minlength=self.group_count)
+        last = np.cumsum(points) - 1
+        position = np.searchsorted(cumulative, before[present] + q * totals[present])
+        result = np.full(self.group_count, np.nan)
+        result[present] = self.values[np.minimum(position, last[present])]
+        return result
+
+    @classmethod
+    def _summarize(
+        cls,
+        groups: np.ndarray,
+        values: np.ndarray,
+        weights: np.ndarray,
+        group_count: int,
+        size: int,
+    ) -> QuantileSketch:
+        order = _sorted_by_group(groups, values)
+        groups, values, weights = groups[order], values[order], weights[order]
+        points = np.bincount(groups, minlength=group_count)
+        if points.max(initial=0) <= size:
+            return cls(groups, values, weights, group_count, size)
+
+        # Pick ``kept`` points per group at the midpoints of equal weight slices.
+        totals = np.bincount(groups, weights=weights, minlength=group_count)
+        before = np.cumsum(totals) - totals
+        kept = np.minimum(points, size)
+        kept_groups = np.repeat(np.arange(group_count), kept)
+        slot = np.arange(len(kept_groups)) - np.repeat(np.cumsum(kept) - kept, kept)
+        share = totals[kept_groups] / kept[kept_groups]
+        targets = before[kept_groups] + (slot + 0.5) * share
+        position = np.searchsorted(np.cumsum(weights), targets)
+        position = np.minimum(position, (np.cumsum(points) - 1)[kept_groups])
+        return cls(kept_groups, values[position], share, group_count, size)
+
+
+def group_quantiles(
+    groups: np.ndarray,
+    values: np.ndarray,
+    group_count: int,
+    q: float,
+    mode: str = "exact",
+    chunk_rows: int = SKETCH_CHUNK_ROWS,
+) -> np.ndarray:
+    """Quantile ``q`` of ``values`` per group, exactly or from merged chunk sketches.
+
+    ``"exact"`` is also the faster mode; ``"sketch"`` trades accuracy (see
+    :class:`QuantileSketch`) for summaries that stay small per chunk.
+    """
+    if mode not in QUANTILE_MODES:
+        raise ValueError(f"Unknown quantile mode {mode!r}; expected one of {QUANTILE_MODES}.")
+    values = np.asarray(values, dtype=float)
+    if mode == "exact":
+        return exact_quantiles(groups, values, group_count, q)
+    sketches = [
+        QuantileSketch.build(
+            groups[start : start + chunk_rows], values[start : start + chunk_rows], group_count
+        )
+        for start in range(0, max(len(values), 1), chunk_rows)
+    ]
+    return QuantileSketch.merge_all(sketches).quantile(q)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+ENV_PREFIX = "CSV_INSIGHT_"
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(f"{ENV_PREFIX}{name}")
+    if raw is None or not raw.strip():
+        return default
+    return int(raw)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.environ.get(f"{ENV_PREFIX}{name}")
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_str(name: str, default: str) -> str:
+    raw = os.environ.get(f"{ENV_PREFIX}{name}")
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip()
+
+
+@dataclass(frozen=True)
+class AppSettings:
+    """Deployment settings, overridable through ``CSV_INSIGHT_*`` environment variables."""
+
+    dataset_memory_budget_mb: int = 2048
+    dataset_idle_expire_s: int = 6 * 3600
+    csv_engine: str = "pandas"
+    stream_chunk_rows: int = 0
+    compact_dtypes: bool = True
+    filter_cache_entries: int = 64
+    filter_cache_mb: int = 256
+    figure_cache_entries: int = 128
+    cube_cache_entries: int = 32
+    preview_cache_entries: int = 16
+    webgl_threshold: int = 10_000
+    heatmap_bins: int = 100
+    quantile_mode: str = "exact"
+    chart_workers: int = 0
+    # Slow charts stop blocking requests, but jobs do not share caches with the server.
+    background_charts: bool = False
+    background_cache_dir: str = ""
+    background_cache_expire_s: int = 600
+
+    @classmethod
+    def from_env(cls) -> "AppSettings":
+        defaults = cls()
+        return cls(
+            dataset_memory_budget_mb=_env_int(
+                "DATASET_MEMORY_MB", defaults.dataset_memory_budget_mb
+            ),
+            dataset_idle_expire_s=_env_int(
+                "DATASET_IDLE_EXPIRE_S", defaults.dataset_idle_expire_s
+            ),
+            csv_engine=_env_str("CSV_ENGINE", defaults.csv_engine),
+            stream_chunk_rows=_env_int("STREAM_CHUNK_ROWS", defaults.stream_chunk_rows),
+            compact_dtypes=_env_bool("COMPACT_DTYPES", defaults.compact_dtypes),
+            filter_cache_entries=_env_int(
+                "FILTER_CACHE_ENTRIES", defaults.filter_cache_entries
+            ),
+            filter_cache_mb=_env_int("FILTER_CACHE_MB", defaults.filter_cache_mb),
+            figure_cache_entries=_env_int(
+                "FIGURE_CACHE_ENTRIES", defaults.figure_cache_entries
+            ),
+            cube_cache_entries=_env_int("CUBE_CACHE_ENTRIES", defaults.cube_cache_entries),
+            preview_cache_entries=_env_int(
+                "PREVIEW_CACHE_ENTRIES", defaults.preview_cache_entries
+            ),
+            webgl_threshold=_env_int("WEBGL_THRESHOLD", defaults.webgl_threshold),
+            heatmap_bins=_env_int("HEATMAP_BINS", defaults.heatmap_bins),
+            quantile_mode=_env_str("QUANTILE_MODE", defaults.quantile_mode),
+            chart_workers=_env_int("CHART_WORKERS", defaults.chart_workers),
+            background_charts=_env_bool("BACKGROUND_CHARTS", defaults.background_charts),
+            background_cache_dir=_env_str(
+                "BACKGROUND_CACHE_DIR", defaults.background_cache_dir
+            ),
+            background_cache_expire_s=_env_int(
+                "BACKGROUND_CACHE_EXPIRE_S", defaults.background_cache_expire_s
+            ),
+        )
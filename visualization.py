@@ -1,14 +1,46 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, replace
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from dash import dcc, html
+import plotly.graph_objects as go
+import plotly.io as pio
+from dash import Patch, dcc, html
 
-from aggregation import AGGREGATIONS, build_chart_data
+from aggregation import AGGREGATIONS, TIME_BUCKETS, build_chart_data
+from binning import BIN_VALUE, BIN_X, BIN_Y
+from caching import LruCache
+from downsampling import DEFAULT_POINT_BUDGET, DOWNSAMPLING_MODES
 
 CHART_TYPES = ["Line", "Bar", "Pie", "Heatmap"]
+RENDER_MODES = {"Auto": "auto", "SVG": "svg", "WebGL": "webgl"}
+DEFAULT_WEBGL_THRESHOLD = 10_000
+
+# ChartConfig fields that only affect figure layout; changing them never needs
+# the data to be filtered or aggregated again.
+LAYOUT_FIELDS = ("layout_height",)
+
+
+def _trace_groups(
+    chart_data: pd.DataFrame, color: str | None
+) -> list[tuple[str, np.ndarray]]:
+    """Row positions per color value, in order of first appearance like px."""
+    if color is None:
+        return [("", np.arange(len(chart_data)))]
+    codes, labels = pd.factorize(chart_data[color])
+    order = np.argsort(codes, kind="stable")
+    splits = np.cumsum(np.bincount(codes, minlength=len(labels)))[:-1]
+    return [(str(label), positions) for label, positions in zip(labels, np.split(order, splits))]
+
+
+def _column_values(series: pd.Series) -> np.ndarray:
+    # px drops the UTC offset and plots wall-clock times.
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize(None)
+    return series.to_numpy()
 
 
 @dataclass(frozen=True)
@@ -17,16 +49,34 @@ class ChartConfig:
     x_axis: str
     y_axis: str
     aggregation: str
+    time_bucket: str
     color_dimension: str
     line_symbol: str
     line_dash: str
     bar_pattern: str
     bar_facet: str
+    downsampling: str
+    point_budget: int
+    render_mode: str
     layout_height: int
 
 
 class ChartBuilder:
-    """Build chart controls and figures."""
+    """Build chart controls and figures.
+
+    Serialized figures are memoized in ``figures``, an LRU cache whose keys
+    start with the dataset handle and also cover the effective filter and the
+    ``ChartConfig`` minus its layout fields, which are applied on the way out
+    or sent on their own as a ``Patch``.
+    """
+
+    def __init__(
+        self,
+        figure_cache_entries: int = 128,
+        webgl_threshold: int = DEFAULT_WEBGL_THRESHOLD,
+    ) -> None:
+        self.figures: LruCache[dict] = LruCache(figure_cache_entries)
+        self.webgl_threshold = webgl_threshold
 
     def default_config(self, columns: list[str], numeric_columns: list[str]) -> ChartConfig:
         return ChartConfig(
@@ -34,11 +84,15 @@ class ChartBuilder:
             x_axis=columns[0],
             y_axis=numeric_columns[0],
             aggregation="None (raw rows)",
+            time_bucket="none",
             color_dimension="(none)",
             line_symbol="(none)",
             line_dash="(none)",
             bar_pattern="(none)",
             bar_facet="(none)",
+            downsampling="lttb",
+            point_budget=DEFAULT_POINT_BUDGET,
+            render_mode="auto",
             layout_height=480,
         )
 
@@ -95,6 +149,17 @@ class ChartBuilder:
                                     clearable=False,
                                     persistence=True,
                                 ),
+                                html.Label("Time bucket (time x-axis, with aggregation)"),
+                                dcc.Dropdown(
+                                    id={"type": "time-bucket", "index": index},
+                                    options=[
+                                        {"label": label, "value": value}
+                                        for label, value in TIME_BUCKETS.items()
+                                    ],
+                                    value=config.time_bucket,
+                                    clearable=False,
+                                    persistence=True,
+                                ),
                                 html.Label("Color / stack by (optional)"),
                                 dcc.Dropdown(
                                     id={"type": "color-dimension", "index": index},
@@ -119,6 +184,38 @@ class ChartBuilder:
                                     clearable=False,
                                     persistence=True,
                                 ),
+                                html.Label("Downsampling (line charts)"),
+                                dcc.Dropdown(
+                                    id={"type": "downsampling", "index": index},
+                                    options=[
+                                        {"label": label, "value": value}
+                                        for label, value in DOWNSAMPLING_MODES.items()
+                                    ],
+                                    value=config.downsampling,
+                                    clearable=False,
+                                    persistence=True,
+                                ),
+                                html.Label("Point budget per chart"),
+                                dcc.Input(
+                                    id={"type": "point-budget", "index": index},
+                                    type="number",
+                                    min=100,
+                                    step=100,
+                                    value=config.point_budget,
+                                    debounce=True,
+                                    persistence=True,
+                                ),
+                                html.Label("Render mode (line charts)"),
+                                dcc.Dropdown(
+                                    id={"type": "render-mode", "index": index},
+                                    options=[
+                                        {"label": label, "value": value}
+                                        for label, value in RENDER_MODES.items()
+                                    ],
+                                    value=config.render_mode,
+                                    clearable=False,
+                                    persistence=True,
+                                ),
                                 html.Label("Bar pattern (optional)"),
                                 dcc.Dropdown(
                                     id={"type": "bar-pattern", "index": index},
@@ -203,7 +300,11 @@ class ChartBuilder:
                                             "responsive": True,
                                         },
                                     )
-                                )
+                                ),
+                                html.Div(
+                                    id={"type": "chart-render-info", "index": index},
+                                    className="hint",
+                                ),
                             ],
                         ),
                     ],
@@ -211,15 +312,137 @@ class ChartBuilder:
             ],
         )
 
-    def build_figure(self, chart_data: pd.DataFrame, config: ChartConfig) -> dict:
+    def build_figure(
+        self, chart_data: pd.DataFrame, config: ChartConfig, fast_path: bool = True
+    ) -> dict:
         if chart_data.empty:
             return px.scatter().update_layout(
                 title="No data after filtering",
                 xaxis={"visible": False},
                 yaxis={"visible": False},
-                height=config.layout_height,
+                **self.layout_properties(config),
             )
 
+        render_mode = None
+        if config.chart_type == "Line":
+            render_mode = self.resolve_render_mode(config, len(chart_data))
+        fig = self.fast_figure(chart_data, config, render_mode) if fast_path else None
+        if fig is None:
+            fig = self._express_figure(chart_data, config, render_mode)
+
+        if render_mode:
+            fig.update_layout(meta={"render_mode": render_mode, "points": len(chart_data)})
+        # Keep the user's zoom while re-rendered figures share the same x-axis.
+        fig.update_layout(uirevision=config.x_axis, **self.layout_properties(config))
+        return fig
+
+    def fast_figure(
+        self, chart_data: pd.DataFrame, config: ChartConfig, render_mode: str | None = None
+    ) -> go.Figure | None:
+        """Build simple Line / Bar / Pie figures directly from column arrays.
+
+        Produces the same traces and layout as the plotly.express calls in
+        ``_express_figure`` without building px's argument frame. Returns None
+        for configurations that still need px: symbols, dashes, patterns,
+        facets and colored pies.
+        """
+        color = None if config.color_dimension == "(none)" else config.color_dimension
+        layout = {"legend": {"tracegroupgap": 0}, "margin": {"t": 60}}
+
+        if config.chart_type == "Pie":
+            if color is not None:
+                return None
+            pie = go.Pie(
+                labels=_column_values(chart_data[config.x_axis]),
+                values=_column_values(chart_data[config.y_axis]),
+                domain={"x": [0.0, 1.0], "y": [0.0, 1.0]},
+                hovertemplate=(
+                    f"{config.x_axis}=%{{label}}<br>{config.y_axis}=%{{value}}<extra></extra>"
+                ),
+                legendgroup="",
+                name="",
+                showlegend=True,
+            )
+            return go.Figure(pie, layout=layout)
+
+        if config.chart_type == "Line":
+            if config.line_symbol != "(none)" or config.line_dash != "(none)":
+                return None
+        elif config.chart_type == "Bar":
+            if config.bar_pattern != "(none)" or config.bar_facet != "(none)":
+                return None
+            # px.bar maps numeric colors onto a continuous color axis.
+            if color is not None and pd.api.types.is_numeric_dtype(chart_data[color]):
+                return None
+            layout["barmode"] = "stack" if color is not None else "group"
+        else:
+            return None
+        if color is not None and (
+            color in (config.x_axis, config.y_axis) or chart_data[color].isna().any()
+        ):
+            return None
+
+        x_values = _column_values(chart_data[config.x_axis])
+        y_values = _column_values(chart_data[config.y_axis])
+        hover = f"{config.x_axis}=%{{x}}<br>{config.y_axis}=%{{y}}<extra></extra>"
+        # px colors traces from the active template's colorway.
+        palette = (
+            pio.templates[pio.templates.default].layout.colorway
+            or px.colors.qualitative.Plotly
+        )
+        traces = []
+        for number, (label, positions) in enumerate(_trace_groups(chart_data, color)):
+            trace_color = palette[number % len(palette)]
+            common = {
+                "x": x_values[positions],
+                "y": y_values[positions],
+                "name": label,
+                "legendgroup": label,
+                "showlegend": color is not None,
+                "hovertemplate": f"{color}={label}<br>{hover}" if color else hover,
+                "xaxis": "x",
+                "yaxis": "y",
+            }
+            if config.chart_type == "Bar":
+                if color is None:
+                    common.update(alignmentgroup="True", offsetgroup="")
+                traces.append(
+                    go.Bar(
+                        marker={"color": trace_color, "pattern": {"shape": ""}},
+                        orientation="v",
+                        textposition="auto",
+                        **common,
+                    )
+                )
+            elif render_mode == "webgl":
+                traces.append(
+                    go.Scattergl(
+                        mode="lines+markers",
+                        line={"color": trace_color, "dash": "solid"},
+                        marker={"symbol": "circle"},
+                        **common,
+                    )
+                )
+            else:
+                traces.append(
+                    go.Scatter(
+                        mode="lines+markers",
+                        line={"color": trace_color, "dash": "solid"},
+                        marker={"symbol": "circle"},
+                        orientation="v",
+                        **common,
+                    )
+                )
+
+        if color is not None:
+            layout["legend"]["title"] = {"text": color}
+        for axis, anchor, title in (("xaxis", "y", config.x_axis), ("yaxis", "x", config.y_axis)):
+            layout[axis] = {"anchor": anchor, "domain": [0.0, 1.0], "title": {"text": title}}
+        return go.Figure(traces, layout=layout)
+
+    def _express_figure(
+        self, chart_data: pd.DataFrame, config: ChartConfig, render_mode: str | None
+    ) -> go.Figure:
         if config.chart_type == "Line":
             fig = px.line(
                 chart_data,
@@ -229,6 +452,7 @@ class ChartBuilder:
                 symbol=None if config.line_symbol == "(none)" else config.line_symbol,
                 line_dash=None if config.line_dash == "(none)" else config.line_dash,
                 markers=True,
+                render_mode=render_mode,
             )
         elif config.chart_type == "Bar":
             bar_mode = "stack" if config.color_dimension != "(none)" else "group"
@@ -249,20 +473,68 @@ class ChartBuilder:
                 color=None if config.color_dimension == "(none)" else config.color_dimension,
             )
         else:
-            fig = px.density_heatmap(
-                chart_data,
-                x=config.x_axis,
-                y=config.y_axis,
-                z=config.y_axis if config.aggregation != "None (raw rows)" else None,
-                histfunc=AGGREGATIONS.get(config.aggregation) or "count",
-                color_continuous_scale="Viridis",
+            # Heatmap data arrives already binned (see ``binning.rasterize``).
+            histfunc = AGGREGATIONS.get(config.aggregation) or "count"
+            fig = go.Figure(
+                go.Heatmap(
+                    x=chart_data[BIN_X],
+                    y=chart_data[BIN_Y],
+                    z=chart_data[BIN_VALUE],
+                    colorscale="Viridis",
+                    colorbar={"title": {"text": f"{histfunc} of {config.y_axis}"}},
+                    hoverongaps=False,
+                )
+            ).update_layout(
+                xaxis_title=config.x_axis,
+                yaxis_title=config.y_axis,
             )
+        return fig
 
-        fig.update_layout(
-            height=int(config.layout_height),
-            margin=dict(l=20, r=20, t=40, b=20),
+    def resolve_render_mode(self, config: ChartConfig, point_count: int) -> str:
+        if config.render_mode != "auto":
+            return config.render_mode
+        return "webgl" if point_count > self.webgl_threshold else "svg"
+
+    def render_info(self, figure: dict) -> str:
+        meta = figure.get("layout", {}).get("meta") or {}
+        if not meta:
+            return ""
+        mode = "WebGL" if meta["render_mode"] == "webgl" else "SVG"
+        return (
+            f"Rendering {meta['points']:,} points as {mode} "
+            f"(auto switches to WebGL above {self.webgl_threshold:,})."
         )
-        return fig
+
+    @staticmethod
+    def layout_properties(config: ChartConfig) -> dict:
+        return {
+            "height": int(config.layout_height),
+            "margin": dict(l=20, r=20, t=40, b=20),
+        }
+
+    def layout_patch(self, config: ChartConfig) -> Patch:
+        """Partial figure update carrying only the layout-derived properties."""
+        patch = Patch()
+        for key, value in self.layout_properties(config).items():
+            patch["layout"][key] = value
+        return patch
+
+    def cached_figure(
+        self,
+        key: tuple,
+        config: ChartConfig,
+        chart_data: Callable[[], pd.DataFrame],
+    ) -> dict:
+        """Return the figure for ``key`` and ``config``, building it from ``chart_data()`` on a miss."""
+        data_config = replace(config, **{field: None for field in LAYOUT_FIELDS})
+        figure = self.figures.get_or_compute(
+            (*key, data_config),
+            lambda: self.build_figure(chart_data(), config).to_plotly_json(),
+        )
+        return {**figure, "layout": {**figure["layout"], **self.layout_properties(config)}}
+
+    def discard(self, dataset_key: str) -> None:
+        self.figures.discard_where(lambda key: key[0] == dataset_key)
 
     def to_config(
         self,
@@ -270,11 +542,15 @@ class ChartBuilder:
         x_axis: str,
         y_axis: str,
         aggregation: str,
+        time_bucket: str,
         color_dimension: str,
         line_symbol: str,
         line_dash: str,
         bar_pattern: str,
         bar_facet: str,
+        downsampling: str,
+        point_budget: int | None,
+        render_mode: str,
         layout_height: int,
     ) -> ChartConfig:
         return ChartConfig(
@@ -282,10 +558,14 @@ class ChartBuilder:
             x_axis=x_axis,
             y_axis=y_axis,
             aggregation=aggregation,
+            time_bucket=time_bucket,
             color_dimension=color_dimension,
             line_symbol=line_symbol,
             line_dash=line_dash,
             bar_pattern=bar_pattern,
             bar_facet=bar_facet,
+            downsampling=downsampling,
+            point_budget=int(point_budget or DEFAULT_POINT_BUDGET),
+            render_mode=render_mode,
             layout_height=layout_height,
         )